@@ -12,6 +12,7 @@ from core import models
 class UserAdmin(BaseUserAdmin):
     ordering = ["id"]
     list_display = ["email", "first_name", "last_name"]
+    readonly_fields = ("last_used",)
     fieldsets = (
         (None, {"fields": ("email", "password")}),
         (_("Personal Info"), {"fields": ("first_name", "last_name")}),
@@ -19,7 +20,7 @@ class UserAdmin(BaseUserAdmin):
             _("Permissions"),
             {"fields": ("is_active", "is_staff", "is_superuser")},
         ),
-        (_("Important dates"), {"fields": ("last_login",)}),
+        (_("Important dates"), {"fields": ("last_login", "last_used")}),
     )
     add_fieldsets = (
         (
@@ -52,7 +53,13 @@ class ParticipantAdmin(admin.ModelAdmin):
         ("grade", MultiSelectRelatedDropdownFilter),
         ("created", DateRangeFilter),
     )
-    search_fields = ("first_name", "last_name")
+    search_fields = (
+        "first_name",
+        "last_name",
+        "parent_name",
+        "primary_contact_no",
+        "alternate_contact_no",
+    )
     list_max_show_all = 1200
     actions = [
         export_selected_objects,
@@ -104,8 +111,25 @@ class SessionAdmin(admin.ModelAdmin):
     list_display = ("name", "description", "start_date", "end_date")
 
 
+class HistoryAdmin(admin.ModelAdmin):
+    """
+    Read-only admin for the day_1..day_5 tables check-ins were stored in
+    before AttendanceEvent. They are not updated any more, new admissions
+    and pickups are listed under attendance events.
+    """
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(models.ParticipantAttendance)
-class ParticipantAttendanceAdmin(admin.ModelAdmin):
+class ParticipantAttendanceAdmin(HistoryAdmin):
     def get_queryset(self, request):
         return models.ParticipantAttendance.objects.all().select_related("participant")
 
@@ -137,13 +161,9 @@ class ParticipantAttendanceAdmin(admin.ModelAdmin):
     def grade(self, obj):
         return obj.participant.grade
 
-    actions = [
-        export_selected_objects,
-    ]
-
 
 @admin.register(models.ParticipantPickup)
-class ParticipantPickupAdmin(admin.ModelAdmin):
+class ParticipantPickupAdmin(HistoryAdmin):
     def get_queryset(self, request):
         return models.ParticipantPickup.objects.all().select_related("participant")
 
@@ -163,6 +183,44 @@ class ParticipantPickupAdmin(admin.ModelAdmin):
     list_max_show_all = 1200
     raw_id_fields = ["participant"]
 
+    @admin.display()
+    def first_name(self, obj):
+        return obj.participant.first_name
+
+    @admin.display()
+    def last_name(self, obj):
+        return obj.participant.last_name
+
+    @admin.display()
+    def grade(self, obj):
+        return obj.participant.grade
+
+
+@admin.register(models.AttendanceEvent)
+class AttendanceEventAdmin(admin.ModelAdmin):
+    def get_queryset(self, request):
+        return models.AttendanceEvent.objects.all().select_related("participant")
+
+    list_display = (
+        "first_name",
+        "last_name",
+        "grade",
+        "kind",
+        "event_date",
+        "timestamp",
+        "pickup_person",
+        "pickup_code",
+    )
+
+    list_filter = ("kind", "event_date", "participant__grade")
+    search_fields = (
+        "participant__first_name",
+        "participant__last_name",
+        "pickup_code",
+    )
+    list_max_show_all = 1200
+    raw_id_fields = ["participant", "actor"]
+
     actions = [
         export_selected_objects,
     ]
@@ -177,4 +235,22 @@ class ParticipantPickupAdmin(admin.ModelAdmin):
 
     @admin.display()
     def grade(self, obj):
-        return obj.participant.grade
+        return obj.participant.grade_id
+
+
+@admin.register(models.OutboundMessage)
+class OutboundMessageAdmin(admin.ModelAdmin):
+    readonly_fields = (
+        "created",
+        "modified",
+    )
+    list_display = (
+        "recipient",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "sent_at",
+        "created",
+    )
+    list_filter = ("status",)
+    search_fields = ("recipient",)
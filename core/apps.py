@@ -3,3 +3,13 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from django.core.signals import request_started
+
+        from core import signals  # noqa
+        from core.db import check_persistent_connections
+
+        # runs after Django's close_old_connections, which drops
+        # connections past CONN_MAX_AGE
+        request_started.connect(check_persistent_connections)
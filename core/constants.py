@@ -1,7 +0,0 @@
-EVENT_DAY_TO_DATE_MAPPING = {
-    "29-08-2022": "day_1",
-    "30-08-2022": "day_2",
-    "31-08-2022": "day_3",
-    "01-09-2022": "day_4",
-    "02-09-2022": "day_5",
-}
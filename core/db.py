@@ -0,0 +1,71 @@
+import functools
+import time
+
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, close_old_connections, connections
+
+
+def check_persistent_connections(**kwargs):
+    """
+    Close persistent connections that stopped working before a request
+    uses them.
+
+    Connections kept open with CONN_MAX_AGE can be cut by a database
+    restart, a failover or an idle timeout on a pooler. Django 3.2 only
+    drops connections that already raised errors, so the first request on
+    a dead connection would fail; with CONN_HEALTH_CHECKS enabled a
+    reused connection is pinged with SELECT 1 first and reopened lazily
+    when the ping fails.
+    """
+    for conn in connections.all():
+        if (
+            conn.connection is None
+            or not conn.settings_dict.get("CONN_HEALTH_CHECKS")
+            or conn.in_atomic_block
+        ):
+            continue
+        try:
+            usable = conn.is_usable()
+        except DatabaseError:
+            usable = False
+        if not usable:
+            conn.close()
+
+
+def ping_database(alias: str = DEFAULT_DB_ALIAS) -> float:
+    """
+    Run SELECT 1 on a database and return the round trip in seconds.
+
+    Opens the connection if needed, so unlike looking up
+    connections[alias] this fails with OperationalError while the
+    database is not accepting connections.
+    """
+    start = time.perf_counter()
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    return time.perf_counter() - start
+
+
+def database_sync_to_async(func):
+    """
+    Wrap a function that uses the ORM so async views can await it.
+
+    Django 3.2 runs sync code for async views on one shared thread, which
+    serialises every request again. Functions wrapped here run in the
+    event loop's thread pool instead, so check-ins waiting on the database
+    overlap. Each pool thread keeps its own connection, which is recycled
+    like a request thread's: before and after every call connections past
+    CONN_MAX_AGE are closed and reused ones are health checked.
+    """
+
+    @functools.wraps(func)
+    def inner(*args, **kwargs):
+        close_old_connections()
+        check_persistent_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(inner, thread_sensitive=False)
@@ -0,0 +1,52 @@
+import time
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Optional
+
+from django.conf import settings
+
+from core.models import Session, event_dates
+
+# date -> event day ("day_1", ...), rebuilt from Session records when a
+# Session changes in this process or after EVENT_CALENDAR_TTL seconds, so
+# other workers pick up changes too.
+_calendar = None
+_built_at = 0.0
+
+
+def build_event_calendar() -> Dict[date, str]:
+    """
+    Map every date covered by a Session to its event day.
+
+    Weekdays are numbered per year across all sessions, so parallel
+    sessions share day numbers and the first session date of a year is
+    day_1. An event can run on any number of days.
+    """
+    dates_by_year = defaultdict(set)
+    for start_date, end_date in Session.objects.values_list("start_date", "end_date"):
+        for day in event_dates(start_date, end_date):
+            dates_by_year[day.year].add(day)
+
+    calendar = {}
+    for dates in dates_by_year.values():
+        for number, day in enumerate(sorted(dates), start=1):
+            calendar[day] = f"day_{number}"
+    return calendar
+
+
+def get_event_calendar() -> Dict[date, str]:
+    global _calendar, _built_at
+    if _calendar is None or time.monotonic() - _built_at > settings.EVENT_CALENDAR_TTL:
+        _calendar = build_event_calendar()
+        _built_at = time.monotonic()
+    return _calendar
+
+
+def clear_event_calendar():
+    global _calendar
+    _calendar = None
+
+
+def get_event_day(day: Optional[date] = None) -> Optional[str]:
+    """return the event day for a date (today by default), None outside the event"""
+    return get_event_calendar().get(day or date.today())
@@ -0,0 +1,69 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.urls import reverse
+
+
+class Command(BaseCommand):
+    """django command to compare request latency with and without persistent connections"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--host', help='Host header to send, the first allowed host by default'
+        )
+        parser.add_argument(
+            '--max-age', type=int, default=60,
+            help='CONN_MAX_AGE used for the persistent run'
+        )
+
+    def handle(self, *args, **options):
+        # requests go through the WSGI handler, so connections are opened
+        # and closed exactly as under gunicorn or serverless-wsgi
+        handler = WSGIHandler()
+        host = options['host'] or next(
+            (host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*'),
+            'localhost',
+        )
+        environ = RequestFactory(HTTP_HOST=host).get(
+            reverse('participant:grade-list')).environ
+        original_max_age = connection.settings_dict['CONN_MAX_AGE']
+        try:
+            for label, max_age in (
+                ('new connection per request', 0),
+                (f'CONN_MAX_AGE={options["max_age"]}', options['max_age']),
+            ):
+                connection.close()
+                connection.settings_dict['CONN_MAX_AGE'] = max_age
+                timings = [
+                    self.timed_request(handler, environ)
+                    for _ in range(options['requests'])
+                ]
+                self.stdout.write(
+                    f'{label:<28} mean {statistics.mean(timings):6.2f} ms  '
+                    f'p50 {statistics.median(timings):6.2f} ms  '
+                    f'p95 {self.percentile(timings, 95):6.2f} ms'
+                )
+        finally:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = original_max_age
+
+    def timed_request(self, handler, environ):
+        start = time.perf_counter()
+        response = handler(dict(environ), lambda status, headers: None)
+        b''.join(response)
+        response.close()
+        elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code != 200:
+            raise CommandError(f'Request failed with status {response.status_code}')
+        return elapsed
+
+    @staticmethod
+    def percentile(values, percent):
+        values = sorted(values)
+        return values[min(len(values) - 1, len(values) * percent // 100)]
@@ -0,0 +1,70 @@
+import os
+import re
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+# what a fresh serverless container does before answering its first request
+STARTUP_SCRIPT = (
+    "from vbs_registration.wsgi import application; "
+    "from django.urls import get_resolver; "
+    "get_resolver().url_patterns"
+)
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(output):
+    """
+    Parse `python -X importtime` output into the total import time in
+    microseconds and the self time of every imported module.
+    """
+    total = 0
+    self_times = {}
+    for line in output.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_time, cumulative, indent, module = match.groups()
+        self_times[module] = int(self_time)
+        if len(indent) == 1:
+            total += int(cumulative)
+    return total, self_times
+
+
+class Command(BaseCommand):
+    """django command to compare cold start import time of settings profiles"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'settings_modules', nargs='*', default=['settings', 'settings.api'],
+            help='Settings modules to boot, the full and API profiles by default'
+        )
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--top', type=int, default=10)
+
+    def handle(self, *args, **options):
+        for settings_module in options['settings_modules']:
+            runs = [self.boot(settings_module) for _ in range(options['runs'])]
+            # the fastest run is the one least disturbed by the rest of the machine
+            total, self_times = min(runs, key=lambda run: run[0])
+            self.stdout.write(
+                f'{settings_module}: {total / 1000:.1f} ms to import '
+                f'{len(self_times)} modules (best of {len(runs)})'
+            )
+            slowest = sorted(self_times.items(), key=lambda item: item[1], reverse=True)
+            for module, self_time in slowest[:options['top']]:
+                self.stdout.write(f'  {self_time / 1000:8.1f} ms  {module}')
+
+    def boot(self, settings_module):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+            env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        if result.returncode:
+            raise CommandError(
+                f'{settings_module} failed to start:\n{result.stderr[-2000:]}')
+        return parse_importtime(result.stderr)
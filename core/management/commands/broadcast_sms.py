@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.messaging import queue_bulk_sms
+from core.models import Participant
+
+
+class Command(BaseCommand):
+    """django command to queue one message for the parents of participants"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('message')
+        parser.add_argument(
+            '--grade', action='append', default=[],
+            help='Only message parents of participants in this grade'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Participant.objects.all()
+        if options['grade']:
+            queryset = queryset.filter(grade__name__in=options['grade'])
+        phone_numbers = queryset.values_list(
+            'primary_contact_no', flat=True).distinct()
+        queued = queue_bulk_sms(phone_numbers, options['message'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Queued message for {len(queued)} recipient(s)')
+        )
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.messaging import deliver_queued_messages, outbox_batch_size
+
+
+class Command(BaseCommand):
+    """django command to deliver SMS messages queued in the outbox"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Messages per batch, by default what SMS_RATE_LIMIT allows '
+                 'in SMS_SEND_BUDGET seconds'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the outbox instead of exiting once it is drained '
+                 'or SMS_SEND_BUDGET seconds have passed'
+        )
+        parser.add_argument('--interval', type=float, default=2)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size'] or outbox_batch_size()
+        # a single run has to finish within the outbox function's timeout
+        deadline = None if options['loop'] else time.monotonic() + settings.SMS_SEND_BUDGET
+        while True:
+            sent = deliver_queued_messages(batch_size=batch_size, deadline=deadline)
+            if sent:
+                self.stdout.write(f'Sent {sent} message(s)')
+            if sent < batch_size:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+            elif deadline is not None and time.monotonic() >= deadline:
+                break
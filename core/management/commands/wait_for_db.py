@@ -1,20 +1,49 @@
+import random
 import time
 
-from django.db import connections
+from django.db import DEFAULT_DB_ALIAS
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+
+from core.db import ping_database
 
 
 class Command(BaseCommand):
     """django command to pause execution until database is ready"""
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Database alias to wait for'
+        )
+        parser.add_argument(
+            '--timeout', type=float, default=60,
+            help='Seconds to wait before giving up with a non-zero exit code'
+        )
+        parser.add_argument(
+            '--max-delay', type=float, default=5,
+            help='Longest pause between attempts in seconds'
+        )
+
     def handle(self, *args, **options):
         self.stdout.write('Waiting for database...')
-        db_conn = None
-        while not db_conn:
+        deadline = time.monotonic() + options['timeout']
+        attempt = 0
+        while True:
             try:
-                db_conn = connections['default']
-            except OperationalError:
-                self.stdout.write('Db unavailable, waiting 1 second...')
-                time.sleep(1)
-        self.stdout.write(self.style.SUCCESS('Database available!'))
+                latency = ping_database(options['database'])
+            except OperationalError as e:
+                attempt += 1
+                # full jitter keeps containers started together from
+                # retrying in lockstep
+                delay = random.uniform(0, min(options['max_delay'], 0.1 * 2 ** attempt))
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CommandError(
+                        f'Database unavailable after {options["timeout"]:g} seconds: {e}')
+                self.stdout.write(f'Db unavailable, waiting {delay:.2f} seconds...')
+                time.sleep(min(delay, remaining))
+            else:
+                break
+        self.stdout.write(self.style.SUCCESS(
+            f'Database available! ({latency * 1000:.1f} ms)'))
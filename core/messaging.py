@@ -1,44 +1,252 @@
-import requests
+import time
+from collections import defaultdict
+from datetime import timedelta
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+
 from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import FAILED, PENDING, SENT, OutboundMessage, Participant
 
-from core.models import Participant
+if TYPE_CHECKING:
+    import requests
+
+# upper bound of the messages one delivery run leases
+MAX_BATCH_SIZE = 500
 
 endPoint = settings.SMS_ENDPOINT
 apiKey = settings.SMS_API_KEY
 
 
-def send_attendance_message(participant: Participant, vbs_day: str, pickup_code: int):
-    message = (
+class SMSDeliveryError(Exception):
+    """Raised when the SMS gateway does not accept a message"""
+
+
+def attendance_message(participant: Participant, vbs_day: str, pickup_code: int) -> str:
+    return (
         f"Dear {participant.parent_name},\n"
         f"{participant.first_name} {participant.last_name} has been marked as present for VBS {vbs_day.replace('_', ' ')}. "
         f"Your pickup code for this participant is {pickup_code} for VBS {vbs_day.replace('_', ' ')}. "
         f"Please keep this code handy when picking up your ward because it will be required to confirm pickup rights."
         f"Only share this code with someone who would be picking up your ward if needed."
     )
-    send_sms(phone_number=participant.primary_contact_no, message=message)
 
 
-def send_pickup_message(participant: Participant, vbs_day: str, pickup_person: str):
-    message = (
+def pickup_message(participant: Participant, vbs_day: str, pickup_person: str) -> str:
+    return (
         f"Dear {participant.parent_name},\n"
-        f"{participant.first_name} {participant.last_name} ({participant.grade}) has been picked up from the LIC premises "
+        f"{participant.first_name} {participant.last_name} ({participant.grade_id}) has been picked up from the LIC premises "
         f"for VBS {vbs_day.replace('_', ' ')}. "
         f"Please contact LIC VBS Admin on 0206052429 / 0208207958 / 0249333630 "
         f"immediately if this is unexpected or you have any questions or concerns."
     )
-    send_sms(phone_number=participant.primary_contact_no, message=message)
+
+
+def send_attendance_message(participant: Participant, vbs_day: str, pickup_code: int):
+    message = attendance_message(participant, vbs_day, pickup_code)
+    queue_sms(phone_number=participant.primary_contact_no, message=message)
+
+
+def send_pickup_message(participant: Participant, vbs_day: str, pickup_person: str):
+    message = pickup_message(participant, vbs_day, pickup_person)
+    queue_sms(phone_number=participant.primary_contact_no, message=message)
+
+
+def queue_sms(phone_number: str, message: str) -> OutboundMessage:
+    """Add a message to the outbox, it is sent by the send_queued_messages command"""
+    return OutboundMessage.objects.create(recipient=phone_number, message=message)
+
+
+def queue_bulk_sms(phone_numbers: Iterable[str], message: str) -> List[OutboundMessage]:
+    """Add the same message for many recipients to the outbox in one insert"""
+    return OutboundMessage.objects.bulk_create(
+        OutboundMessage(recipient=phone_number, message=message)
+        for phone_number in dict.fromkeys(phone_numbers)
+    )
+
+
+def queue_messages(messages: Iterable[Tuple[str, str]]) -> List[OutboundMessage]:
+    """Add (phone_number, message) pairs to the outbox in one insert"""
+    return OutboundMessage.objects.bulk_create(
+        OutboundMessage(recipient=phone_number, message=message)
+        for phone_number, message in messages
+    )
+
+
+class RateLimiter:
+    """Spaces out calls so that at most `rate` are made per second"""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate else 0
+        self.last_call = None
+
+    def wait(self):
+        if self.last_call is not None:
+            remaining = self.last_call + self.interval - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+        self.last_call = time.monotonic()
+
+
+_session = None
+
+
+def get_session() -> "requests.Session":
+    """Return the process wide keep-alive session used for gateway calls"""
+    global _session
+    if _session is None:
+        # requests is only imported by the outbox worker, API requests
+        # queue messages and never talk to the gateway
+        import requests
+
+        _session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=settings.SMS_POOL_SIZE
+        )
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    return _session
 
 
 def send_sms(phone_number: str, message: str):
+    send_bulk_sms(phone_numbers=[phone_number], message=message)
+
+
+def send_bulk_sms(phone_numbers: List[str], message: str):
+    """Send one message to several recipients in a single gateway call"""
+    import requests
+
     data = {
         "sender": "LIC VBS",
-        "recipient[]": [phone_number],
+        "recipient[]": phone_numbers,
         "message": message,
     }
-    response = requests.post(
-        f"{settings.SMS_ENDPOINT}?key={settings.SMS_API_KEY}", data
+    try:
+        response = get_session().post(
+            f"{settings.SMS_ENDPOINT}?key={settings.SMS_API_KEY}",
+            data,
+            timeout=settings.SMS_TIMEOUT,
+        )
+        res_data = response.json()
+    except (requests.RequestException, ValueError) as e:
+        raise SMSDeliveryError(str(e)) from e
+    if not isinstance(res_data, dict) or res_data.get("status") != "success":
+        raise SMSDeliveryError(str(res_data))
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff for the given number of failed attempts"""
+    return timedelta(seconds=settings.SMS_RETRY_BACKOFF * 2 ** (attempts - 1))
+
+
+def claim_queued_messages(batch_size: int) -> List[OutboundMessage]:
+    """
+    Lease a batch of due messages to this worker and return them.
+
+    The lease pushes next_attempt_at SMS_CLAIM_TIMEOUT seconds ahead and is
+    committed before anything is sent, so other workers skip the batch and
+    a worker that dies mid-batch only delays the messages it had not
+    finished with.
+    """
+    with transaction.atomic():
+        messages = list(
+            OutboundMessage.objects.select_for_update(skip_locked=True)
+            .filter(status=PENDING, next_attempt_at__lte=timezone.now())
+            .order_by("next_attempt_at")[:batch_size]
+        )
+        OutboundMessage.objects.filter(id__in=[m.id for m in messages]).update(
+            next_attempt_at=timezone.now()
+            + timedelta(seconds=settings.SMS_CLAIM_TIMEOUT),
+        )
+    return messages
+
+
+def outbox_batch_size() -> int:
+    """Return how many messages one delivery run can send in SMS_SEND_BUDGET"""
+    # at worst every message has its own text and needs a gateway call
+    if not settings.SMS_RATE_LIMIT:
+        return MAX_BATCH_SIZE
+    calls = int(settings.SMS_RATE_LIMIT * settings.SMS_SEND_BUDGET)
+    return max(1, min(MAX_BATCH_SIZE, calls))
+
+
+def release_messages(messages: Iterable[OutboundMessage]):
+    """Hand leased messages that were not sent back to the outbox"""
+    OutboundMessage.objects.filter(id__in=[m.id for m in messages]).update(
+        next_attempt_at=timezone.now()
     )
-    res_data = response.json()
-    if res_data.get("status") != "success":
-        print("Error sending SMS")
-        print(res_data)
+
+
+def deliver_queued_messages(
+    batch_size: Optional[int] = None, deadline: Optional[float] = None
+) -> int:
+    """
+    Send a batch of due messages from the outbox and return the number sent.
+
+    Messages are leased with claim_queued_messages, then sent outside any
+    transaction. Each gateway call is followed by its own status update,
+    so messages that were delivered stay delivered whatever happens to the
+    rest of the batch. Messages with identical text are coalesced into
+    multi-recipient gateway calls of up to SMS_BATCH_SIZE recipients,
+    paced by SMS_RATE_LIMIT calls per second.
+
+    The batch defaults to outbox_batch_size(). No gateway call is started
+    after `deadline` (a time.monotonic() value, SMS_SEND_BUDGET seconds
+    from now by default), messages left over are released right away.
+    """
+    if batch_size is None:
+        batch_size = outbox_batch_size()
+    if deadline is None:
+        deadline = time.monotonic() + settings.SMS_SEND_BUDGET
+    sent = 0
+    limiter = RateLimiter(settings.SMS_RATE_LIMIT)
+    groups = defaultdict(list)
+    for outbound in claim_queued_messages(batch_size):
+        groups[outbound.message].append(outbound)
+    chunks = [
+        (text, group[i:i + settings.SMS_BATCH_SIZE])
+        for text, group in groups.items()
+        for i in range(0, len(group), settings.SMS_BATCH_SIZE)
+    ]
+
+    for index, (text, chunk) in enumerate(chunks):
+        limiter.wait()
+        if time.monotonic() >= deadline:
+            release_messages(m for _, unsent in chunks[index:] for m in unsent)
+            break
+        try:
+            send_bulk_sms(
+                phone_numbers=[outbound.recipient for outbound in chunk],
+                message=text,
+            )
+        except SMSDeliveryError as e:
+            error = str(e)
+        else:
+            error = None
+            sent += len(chunk)
+        for outbound in chunk:
+            record_attempt(outbound, error)
+        OutboundMessage.objects.bulk_update(
+            chunk,
+            [
+                "status", "attempts", "next_attempt_at",
+                "last_error", "sent_at", "modified",
+            ],
+        )
+    return sent
+
+
+def record_attempt(outbound: OutboundMessage, error: Optional[str]):
+    """Update the delivery status of a message after a gateway call"""
+    outbound.attempts += 1
+    outbound.modified = timezone.now()
+    if error is None:
+        outbound.status = SENT
+        outbound.sent_at = timezone.now()
+    elif outbound.attempts >= settings.SMS_MAX_ATTEMPTS:
+        outbound.status = FAILED
+        outbound.last_error = error
+    else:
+        outbound.last_error = error
+        outbound.next_attempt_at = timezone.now() + retry_delay(outbound.attempts)
@@ -0,0 +1,90 @@
+# Generated by Django 3.2.25 on 2026-10-17 22:51
+
+import random
+
+from django.db import migrations, models
+from django.db.models import Count
+
+EVENT_DAYS = ("day_1", "day_2", "day_3", "day_4", "day_5")
+
+
+def reassign_duplicate_codes(apps, schema_editor):
+    """give every row but the first a fresh code where a day code repeats"""
+    PickupCode = apps.get_model("core", "PickupCode")
+    for day in EVENT_DAYS:
+        duplicates = (
+            PickupCode.objects.exclude(**{day: ""})
+            .values(day)
+            .annotate(count=Count("id"))
+            .filter(count__gt=1)
+            .values_list(day, flat=True)
+        )
+        used = set(PickupCode.objects.values_list(day, flat=True))
+        for code in list(duplicates):
+            for pickup_code in PickupCode.objects.filter(**{day: code}).order_by("id")[1:]:
+                new_code = str(random.randint(10000, 99999))
+                while new_code in used:
+                    new_code = str(random.randint(10000, 99999))
+                used.add(new_code)
+                setattr(pickup_code, day, new_code)
+                pickup_code.save(update_fields=[day])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_outboundmessage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pickupcode',
+            name='day_1',
+            field=models.CharField(max_length=5),
+        ),
+        migrations.AlterField(
+            model_name='pickupcode',
+            name='day_2',
+            field=models.CharField(max_length=5),
+        ),
+        migrations.AlterField(
+            model_name='pickupcode',
+            name='day_3',
+            field=models.CharField(max_length=5),
+        ),
+        migrations.AlterField(
+            model_name='pickupcode',
+            name='day_4',
+            field=models.CharField(max_length=5),
+        ),
+        migrations.AlterField(
+            model_name='pickupcode',
+            name='day_5',
+            field=models.CharField(max_length=5),
+        ),
+        migrations.RunPython(reassign_duplicate_codes, migrations.RunPython.noop),
+        migrations.RunSQL(
+            [f"CREATE SEQUENCE core_pickupcode_{day}_seq" for day in EVENT_DAYS],
+            [f"DROP SEQUENCE core_pickupcode_{day}_seq" for day in EVENT_DAYS],
+        ),
+        migrations.AddConstraint(
+            model_name='pickupcode',
+            constraint=models.UniqueConstraint(condition=models.Q(('day_1', ''), _negated=True), fields=('day_1',), name='unique_pickup_code_day_1'),
+        ),
+        migrations.AddConstraint(
+            model_name='pickupcode',
+            constraint=models.UniqueConstraint(condition=models.Q(('day_2', ''), _negated=True), fields=('day_2',), name='unique_pickup_code_day_2'),
+        ),
+        migrations.AddConstraint(
+            model_name='pickupcode',
+            constraint=models.UniqueConstraint(condition=models.Q(('day_3', ''), _negated=True), fields=('day_3',), name='unique_pickup_code_day_3'),
+        ),
+        migrations.AddConstraint(
+            model_name='pickupcode',
+            constraint=models.UniqueConstraint(condition=models.Q(('day_4', ''), _negated=True), fields=('day_4',), name='unique_pickup_code_day_4'),
+        ),
+        migrations.AddConstraint(
+            model_name='pickupcode',
+            constraint=models.UniqueConstraint(condition=models.Q(('day_5', ''), _negated=True), fields=('day_5',), name='unique_pickup_code_day_5'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# icontains compiles to UPPER(field::text) LIKE UPPER(%s) on PostgreSQL, so
+# the trigram indexes are built on that expression for the planner to use.
+SEARCH_FIELDS = (
+    "first_name",
+    "last_name",
+    "parent_name",
+    "primary_contact_no",
+    "alternate_contact_no",
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0016_unique_pickup_codes"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunSQL(
+            [
+                f'CREATE INDEX core_participant_{field}_trgm ON core_participant '
+                f'USING gin (UPPER("{field}"::text) gin_trgm_ops)'
+                for field in SEARCH_FIELDS
+            ],
+            [f"DROP INDEX core_participant_{field}_trgm" for field in SEARCH_FIELDS],
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.25 on 2026-10-17 22:55
+
+from django.db import migrations, models
+import django.db.models.expressions
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_participant_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='participant',
+            index=models.Index(django.db.models.functions.text.Lower('first_name'), django.db.models.expressions.F('id'), name='participant_name_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.25 on 2026-10-17 22:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_participant_name_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_date', models.DateField()),
+                ('kind', models.CharField(choices=[('Admission', 'ADMISSION'), ('Pickup', 'PICKUP')], max_length=9)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('pickup_person', models.CharField(blank=True, max_length=150, null=True)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('participant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.participant')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='attendanceevent',
+            index=models.Index(fields=['event_date', 'kind', 'participant'], name='attendance_event_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendanceevent',
+            constraint=models.UniqueConstraint(fields=('participant', 'event_date', 'kind'), name='unique_attendance_event'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+from django.db import migrations
+
+EVENT_DAYS = ("day_1", "day_2", "day_3", "day_4", "day_5")
+BATCH_SIZE = 1000
+
+
+def copy_attendance_events(apps, schema_editor):
+    """turn every filled day_N column into an AttendanceEvent row"""
+    AttendanceEvent = apps.get_model("core", "AttendanceEvent")
+    ParticipantAttendance = apps.get_model("core", "ParticipantAttendance")
+    ParticipantPickup = apps.get_model("core", "ParticipantPickup")
+
+    events = []
+    for attendance in ParticipantAttendance.objects.iterator():
+        for day in EVENT_DAYS:
+            timestamp = getattr(attendance, day)
+            if timestamp is not None:
+                events.append(
+                    AttendanceEvent(
+                        participant_id=attendance.participant_id,
+                        event_date=timestamp.date(),
+                        kind="Admission",
+                        timestamp=timestamp,
+                    )
+                )
+    for pickup in ParticipantPickup.objects.iterator():
+        for day in EVENT_DAYS:
+            timestamp = getattr(pickup, day)
+            if timestamp is not None:
+                events.append(
+                    AttendanceEvent(
+                        participant_id=pickup.participant_id,
+                        event_date=timestamp.date(),
+                        kind="Pickup",
+                        timestamp=timestamp,
+                        pickup_person=getattr(pickup, f"{day}_pickup_person"),
+                    )
+                )
+    AttendanceEvent.objects.bulk_create(
+        events, batch_size=BATCH_SIZE, ignore_conflicts=True
+    )
+
+
+def delete_attendance_events(apps, schema_editor):
+    apps.get_model("core", "AttendanceEvent").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0019_attendanceevent"),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_attendance_events, delete_attendance_events),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-17 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_copy_attendance_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendanceevent',
+            name='client_event_id',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:20
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import migrations, models
+
+EVENT_DAYS = ("day_1", "day_2", "day_3", "day_4", "day_5")
+BATCH_SIZE = 1000
+
+
+def event_days_by_date(Session):
+    """number the weekdays of each year's sessions like the event calendar"""
+    dates_by_year = defaultdict(set)
+    for start_date, end_date in Session.objects.values_list("start_date", "end_date"):
+        for offset in range((end_date - start_date).days + 1):
+            day = start_date + timedelta(days=offset)
+            if day.weekday() < 5:
+                dates_by_year[day.year].add(day)
+    return {
+        event_date: day
+        for dates in dates_by_year.values()
+        for day, event_date in zip(EVENT_DAYS, sorted(dates))
+    }
+
+
+def copy_pickup_codes(apps, schema_editor):
+    """move each day_N code onto the latest admission on a day_N date"""
+    Session = apps.get_model("core", "Session")
+    PickupCode = apps.get_model("core", "PickupCode")
+    AttendanceEvent = apps.get_model("core", "AttendanceEvent")
+
+    event_days = event_days_by_date(Session)
+    latest = {}
+    for admission in AttendanceEvent.objects.filter(
+        kind="Admission", event_date__in=event_days
+    ).order_by("event_date"):
+        latest[(admission.participant_id, event_days[admission.event_date])] = admission
+
+    admissions = []
+    for pickup_code in PickupCode.objects.iterator():
+        for day in EVENT_DAYS:
+            admission = latest.get((pickup_code.participant_id, day))
+            code = getattr(pickup_code, day)
+            if admission is not None and code:
+                admission.pickup_code = code
+                admissions.append(admission)
+    AttendanceEvent.objects.bulk_update(
+        admissions, ["pickup_code"], batch_size=BATCH_SIZE
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0022_delta_sync"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attendanceevent",
+            name="pickup_code",
+            field=models.CharField(blank=True, max_length=5, null=True),
+        ),
+        migrations.RunPython(copy_pickup_codes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="attendanceevent",
+            constraint=models.UniqueConstraint(
+                fields=("event_date", "pickup_code"), name="unique_pickup_code"
+            ),
+        ),
+        migrations.DeleteModel(
+            name="PickupCode",
+        ),
+    ]
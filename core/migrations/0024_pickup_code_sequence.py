@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:05
+
+from django.db import migrations
+
+EVENT_DAYS = ("day_1", "day_2", "day_3", "day_4", "day_5")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0023_attendanceevent_pickup_code"),
+    ]
+
+    operations = [
+        # codes are unique per date on the admissions, one sequence serves
+        # every event day instead of one per day_N column
+        migrations.RunSQL(
+            ["CREATE SEQUENCE core_pickup_code_seq"]
+            + [f"DROP SEQUENCE core_pickupcode_{day}_seq" for day in EVENT_DAYS],
+            [f"CREATE SEQUENCE core_pickupcode_{day}_seq" for day in EVENT_DAYS]
+            + ["DROP SEQUENCE core_pickup_code_seq"],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 00:07
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_pickup_code_sequence'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='participantattendance',
+            options={'verbose_name': 'attendance history (see attendance events)', 'verbose_name_plural': 'attendance history (see attendance events)'},
+        ),
+        migrations.AlterModelOptions(
+            name='participantpickup',
+            options={'verbose_name': 'pickup history (see attendance events)', 'verbose_name_plural': 'pickup history (see attendance events)'},
+        ),
+    ]
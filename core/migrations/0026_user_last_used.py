@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 00:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_legacy_attendance_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='last_used',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,12 +1,17 @@
+from datetime import timedelta
+
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin,
 )
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils.timezone import now
 
 
+
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         """creates and saves a new user"""
@@ -36,6 +41,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     created = models.DateTimeField(default=now, editable=False)
     modified = models.DateTimeField(auto_now_add=True)
+    # last API request made with one of the user's tokens, last_login only
+    # changes when the user logs in
+    last_used = models.DateTimeField(null=True, blank=True, editable=False)
 
     objects = UserManager()
 
@@ -98,6 +106,14 @@ class Participant(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     modified = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # supports the (lower(first_name), id) keyset used by the API
+            models.Index(Lower("first_name"), "id", name="participant_name_keyset_idx"),
+            # supports ?modified_since= delta sync
+            models.Index(fields=["modified", "id"], name="participant_modified_idx"),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
@@ -134,10 +150,36 @@ class Volunteer(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     modified = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # supports ?modified_since= delta sync
+            models.Index(fields=["modified", "id"], name="volunteer_modified_idx"),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
 
+class DeletedRecord(models.Model):
+    """
+    Model definition for the tombstone of a deleted participant or volunteer.
+
+    Lets clients that sync with ?modified_since= drop deleted rows.
+    """
+
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["model", "deleted_at"], name="deleted_record_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id}"
+
+
 class AttendanceType(models.Model):
     """Model definition for supported attendance types"""
 
@@ -163,8 +205,13 @@ class BaseParticipantAttendance(models.Model):
         abstract = True
 
 
+# Check-ins before AttendanceEvent was introduced, kept as read-only history
+
+
 class ParticipantAttendance(BaseParticipantAttendance):
-    pass
+    class Meta:
+        verbose_name = "attendance history (see attendance events)"
+        verbose_name_plural = "attendance history (see attendance events)"
 
 
 class ParticipantPickup(BaseParticipantAttendance):
@@ -174,16 +221,75 @@ class ParticipantPickup(BaseParticipantAttendance):
     day_4_pickup_person = models.CharField(max_length=150, null=True, blank=True)
     day_5_pickup_person = models.CharField(max_length=150, null=True, blank=True)
 
+    class Meta:
+        verbose_name = "pickup history (see attendance events)"
+        verbose_name_plural = "pickup history (see attendance events)"
+
+
+ADMISSION = "Admission"
+PICKUP = "Pickup"
+
+ATTENDANCE_EVENT_KIND_OPTIONS = (
+    (ADMISSION, "ADMISSION"),
+    (PICKUP, "PICKUP"),
+)
+
+
+class AttendanceEvent(models.Model):
+    """
+    Model definition for a single admission or pickup of a participant.
 
-class PickupCode(models.Model):
-    """Model definition for pickup code"""
+    Events are append-only, one row per participant, date and kind, so
+    check-ins are single-row inserts and events of any length are supported.
+    Admissions carry the pickup code issued with them, codes are unique per
+    date.
+    """
 
-    participant = models.OneToOneField("Participant", on_delete=models.DO_NOTHING)
-    day_1 = models.CharField(max_length=5, db_index=True)
-    day_2 = models.CharField(max_length=5, db_index=True)
-    day_3 = models.CharField(max_length=5, db_index=True)
-    day_4 = models.CharField(max_length=5, db_index=True)
-    day_5 = models.CharField(max_length=5, db_index=True)
+    participant = models.ForeignKey("Participant", on_delete=models.CASCADE)
+    event_date = models.DateField()
+    kind = models.CharField(max_length=9, choices=ATTENDANCE_EVENT_KIND_OPTIONS)
+    timestamp = models.DateTimeField(default=now)
+    actor = models.ForeignKey(
+        "User", null=True, blank=True, on_delete=models.SET_NULL
+    )
+    pickup_person = models.CharField(max_length=150, null=True, blank=True)
+    pickup_code = models.CharField(max_length=5, null=True, blank=True)
+    # id assigned by the device that recorded the event offline, see the
+    # sync API; lets a device resend a batch without creating duplicates
+    client_event_id = models.CharField(
+        max_length=64, unique=True, null=True, blank=True
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["participant", "event_date", "kind"],
+                name="unique_attendance_event",
+            ),
+            # pickups have no code, NULLs do not collide
+            models.UniqueConstraint(
+                fields=["event_date", "pickup_code"],
+                name="unique_pickup_code",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["event_date", "kind", "participant"],
+                name="attendance_event_day_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.participant_id} {self.kind} {self.event_date}"
+
+
+def event_dates(start_date, end_date):
+    """Return the dates from start_date to end_date the event runs, weekends excluded"""
+    dates = (
+        start_date + timedelta(days=offset)
+        for offset in range((end_date - start_date).days + 1)
+    )
+    return [day for day in dates if day.weekday() < 5]
 
 
 class Session(models.Model):
@@ -200,3 +306,43 @@ class Session(models.Model):
 
     def __str__(self):
         return self.name
+
+    def clean(self):
+        """Reject sessions that end before they start"""
+        if self.start_date is None or self.end_date is None:
+            return
+        if self.end_date < self.start_date:
+            raise ValidationError({"end_date": "The end date is before the start date."})
+
+
+PENDING = "Pending"
+SENT = "Sent"
+FAILED = "Failed"
+
+MESSAGE_STATUS_OPTIONS = (
+    (PENDING, "PENDING"),
+    (SENT, "SENT"),
+    (FAILED, "FAILED"),
+)
+
+
+class OutboundMessage(models.Model):
+    """Model definition for an SMS queued for delivery by the outbox worker"""
+
+    recipient = models.CharField(max_length=15)
+    message = models.TextField()
+    status = models.CharField(
+        max_length=7, choices=MESSAGE_STATUS_OPTIONS, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.recipient} ({self.status})"
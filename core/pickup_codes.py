@@ -0,0 +1,112 @@
+import hashlib
+import hmac
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from core.models import AttendanceEvent
+
+# Pickup codes are the five digit numbers 10000-99999. The code space of
+# 90000 values is split into two base 300 digits and shuffled with a keyed
+# Feistel network, which is a bijection. Codes come from one sequence, so
+# the codes handed out on a date are consecutive positions and never repeat
+# until the whole space has been used that day.
+CODE_OFFSET = 10000
+HALF_SPACE = 300
+CODE_SPACE = HALF_SPACE * HALF_SPACE
+ROUNDS = 4
+SEQUENCE_NAME = "core_pickup_code_seq"
+
+
+def _round_value(round_no: int, value: int) -> int:
+    digest = hmac.new(
+        settings.SECRET_KEY.encode(),
+        f"{round_no}:{value}".encode(),
+        hashlib.sha256,
+    ).digest()
+    return int.from_bytes(digest[:4], "big") % HALF_SPACE
+
+
+def permute(index: int) -> int:
+    """Map a position in [0, CODE_SPACE) to a unique shuffled position"""
+    left, right = divmod(index % CODE_SPACE, HALF_SPACE)
+    for round_no in range(ROUNDS):
+        left, right = right, (left + _round_value(round_no, right)) % HALF_SPACE
+    return left * HALF_SPACE + right
+
+
+def allocate_pickup_codes(count: int = 1) -> List[str]:
+    """
+    Reserve `count` pickup codes in a single query.
+
+    Codes are drawn from a database sequence, so concurrent admissions
+    never receive the same code and no retry loop is needed.
+    """
+    if count < 1:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(%s) FROM generate_series(1, %s)",
+            [SEQUENCE_NAME, count],
+        )
+        return [str(CODE_OFFSET + permute(row[0] - 1)) for row in cursor.fetchall()]
+
+
+def allocate_pickup_code() -> str:
+    """Reserve a single pickup code"""
+    return allocate_pickup_codes()[0]
+
+
+# Today's codes are indexed in the cache so the pickup desk can resolve a
+# code without touching the participant tables. The cache backend is
+# per-process by default and can be pointed at a shared cache in settings.
+# Codes are unique per date, so entries are keyed by the date as well.
+CODE_INDEX_TIMEOUT = 60 * 60 * 24
+
+
+def code_index_key(event_date: date, code: str) -> str:
+    return f"pickup_code:{event_date.isoformat()}:{code}"
+
+
+def index_pickup_codes(codes: Dict[int, str], event_date: Optional[date] = None):
+    """Record participant id -> code assignments for a date in the index"""
+    event_date = event_date or date.today()
+    cache.set_many(
+        {
+            code_index_key(event_date, code): participant_id
+            for participant_id, code in codes.items()
+        },
+        CODE_INDEX_TIMEOUT,
+    )
+
+
+def unindex_pickup_codes(codes: Iterable[Tuple[date, str]]):
+    """Drop (event date, code) assignments from the index"""
+    cache.delete_many(
+        [code_index_key(event_date, code) for event_date, code in codes if code]
+    )
+
+
+def lookup_pickup_code(code: str, event_date: Optional[date] = None) -> Optional[int]:
+    """
+    Return the id of the participant admitted with a code on a date.
+
+    The date is today by default. Misses are answered from the unique
+    (event_date, pickup_code) index of the admissions.
+    """
+    event_date = event_date or date.today()
+    key = code_index_key(event_date, code)
+    participant_id = cache.get(key)
+    if participant_id is not None:
+        return participant_id
+    participant_id = (
+        AttendanceEvent.objects.filter(event_date=event_date, pickup_code=code)
+        .values_list("participant_id", flat=True)
+        .first()
+    )
+    if participant_id is not None:
+        cache.set(key, participant_id, CODE_INDEX_TIMEOUT)
+    return participant_id
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.event_calendar import clear_event_calendar
+from core.models import (
+    AttendanceEvent,
+    DeletedRecord,
+    Participant,
+    Session,
+    Volunteer,
+)
+from core.pickup_codes import unindex_pickup_codes
+
+
+@receiver(post_delete, sender=AttendanceEvent)
+def unindex_deleted_pickup_code(sender, instance, **kwargs):
+    """stop resolving the pickup code of a deleted admission"""
+    unindex_pickup_codes([(instance.event_date, instance.pickup_code)])
+
+
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+def refresh_event_calendar(sender, **kwargs):
+    """rebuild the event calendar after sessions change"""
+    clear_event_calendar()
+
+
+@receiver(post_delete, sender=Participant)
+@receiver(post_delete, sender=Volunteer)
+def record_deletion(sender, instance, **kwargs):
+    """leave a tombstone so delta sync clients learn about the deletion"""
+    DeletedRecord.objects.create(model=sender._meta.model_name, object_id=instance.pk)
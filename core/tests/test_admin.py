@@ -45,3 +45,13 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+    def test_attendance_history_is_read_only(self):
+        """Test the pre-event attendance tables cannot be edited"""
+        res = self.client.get(reverse('admin:core_participantattendance_changelist'))
+        self.assertEqual(res.status_code, 200)
+        self.assertContains(res, 'see attendance events')
+
+        for name in ('participantattendance', 'participantpickup'):
+            res = self.client.get(reverse(f'admin:core_{name}_add'))
+            self.assertEqual(res.status_code, 403)
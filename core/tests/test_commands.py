@@ -1,23 +1,75 @@
+from io import StringIO
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
 
+from core.models import Grade, OutboundMessage, Participant
+
 
 class CommandTests(TestCase):
 
     def test_wait_for_db_when_db_is_ready(self):
         """test waiting for db when db is available"""
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.return_value = True
-            call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 1)
+        with patch('core.management.commands.wait_for_db.ping_database') as ping:
+            ping.return_value = 0.001
+            call_command('wait_for_db', stdout=StringIO())
+            self.assertEqual(ping.call_count, 1)
 
     @patch('time.sleep', return_value=True)
     def test_wait_for_db(self, ts):
         """test wating for the db when db is not ready"""
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.side_effect = [OperationalError] * 5 + [True]
-            call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 6)
+        with patch('core.management.commands.wait_for_db.ping_database') as ping:
+            ping.side_effect = [OperationalError] * 5 + [0.001]
+            call_command('wait_for_db', stdout=StringIO())
+            self.assertEqual(ping.call_count, 6)
+            self.assertEqual(ts.call_count, 5)
+            for (delay,), _ in ts.call_args_list:
+                self.assertLessEqual(delay, 5)
+
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_gives_up_after_timeout(self, ts):
+        """test waiting for the db fails with an error once the timeout passes"""
+        with patch('core.management.commands.wait_for_db.ping_database') as ping:
+            ping.side_effect = OperationalError('connection refused')
+            with patch('time.monotonic', side_effect=[0, 1, 2, 11]):
+                with self.assertRaisesMessage(CommandError, 'connection refused'):
+                    call_command('wait_for_db', timeout=10, stdout=StringIO())
+            self.assertEqual(ping.call_count, 3)
+
+    def test_wait_for_db_runs_a_query(self):
+        """test waiting for the db opens a connection and queries it"""
+        out = StringIO()
+        call_command('wait_for_db', stdout=out)
+        self.assertIn('Database available!', out.getvalue())
+
+    @patch('core.management.commands.send_queued_messages.deliver_queued_messages')
+    def test_send_queued_messages_drains_outbox(self, deliver):
+        """test the outbox worker keeps sending until a batch is not full"""
+        deliver.side_effect = [10, 10, 3]
+        call_command('send_queued_messages', batch_size=10)
+        self.assertEqual(deliver.call_count, 3)
+
+    @override_settings(SMS_SEND_BUDGET=0)
+    @patch('core.management.commands.send_queued_messages.deliver_queued_messages')
+    def test_send_queued_messages_stops_at_send_budget(self, deliver):
+        """test the outbox worker does not outlive its send budget"""
+        deliver.return_value = 10
+        call_command('send_queued_messages', batch_size=10)
+        self.assertEqual(deliver.call_count, 1)
+
+    def test_broadcast_sms_queues_one_message_per_parent(self):
+        """test broadcasting queues a message for each distinct parent number"""
+        grade = Grade.objects.create(name='Class 1')
+        for contact_no in ('0201', '0201', '0202'):
+            Participant.objects.create(
+                first_name='Adoma', last_name='Asomaning', age=8,
+                grade=grade, primary_contact_no=contact_no
+            )
+        call_command('broadcast_sms', 'See you tomorrow', grade=['Class 1'])
+        self.assertEqual(
+            sorted(OutboundMessage.objects.values_list('recipient', flat=True)),
+            ['0201', '0202']
+        )
@@ -0,0 +1,57 @@
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import SimpleTestCase, TransactionTestCase
+
+from core.db import check_persistent_connections
+
+
+def fake_connection(usable=True, health_checks=True):
+    conn = MagicMock(in_atomic_block=False)
+    conn.settings_dict = {'CONN_HEALTH_CHECKS': health_checks}
+    if isinstance(usable, Exception):
+        conn.is_usable.side_effect = usable
+    else:
+        conn.is_usable.return_value = usable
+    return conn
+
+
+class HealthCheckTests(SimpleTestCase):
+
+    def check(self, *conns):
+        with patch('core.db.connections') as connections:
+            connections.all.return_value = conns
+            check_persistent_connections()
+
+    def test_dead_connection_is_closed(self):
+        """test a connection failing the ping is closed before use"""
+        dead, broken = fake_connection(usable=False), fake_connection(
+            usable=DatabaseError())
+        self.check(dead, broken)
+        dead.close.assert_called_once_with()
+        broken.close.assert_called_once_with()
+
+    def test_usable_connection_is_kept(self):
+        """test a working connection is reused"""
+        conn = fake_connection()
+        self.check(conn)
+        conn.close.assert_not_called()
+
+    def test_checks_can_be_disabled(self):
+        """test connections are not pinged without CONN_HEALTH_CHECKS"""
+        conn = fake_connection(usable=False, health_checks=False)
+        self.check(conn)
+        conn.is_usable.assert_not_called()
+
+
+class ConnectionBenchmarkTests(TransactionTestCase):
+
+    def test_benchmark_db_connections(self):
+        """test the benchmark times requests in both connection modes"""
+        out = StringIO()
+        call_command('benchmark_db_connections', requests=2,
+                     host='testserver', stdout=out)
+        self.assertIn('new connection per request', out.getvalue())
+        self.assertIn('CONN_MAX_AGE=60', out.getvalue())
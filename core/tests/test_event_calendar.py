@@ -0,0 +1,75 @@
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from core import models
+from core.event_calendar import clear_event_calendar, get_event_day
+
+
+def sample_session(start_date, end_date, name='Morning'):
+    return models.Session.objects.create(
+        name=name,
+        description='VBS session',
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+class EventCalendarTests(TestCase):
+
+    def setUp(self):
+        clear_event_calendar()
+
+    def test_event_days_follow_session_dates(self):
+        """test days are numbered from the first session date of the year"""
+        sample_session('2023-08-28', '2023-08-30')
+        sample_session('2023-08-29', '2023-09-01', name='Afternoon')
+        sample_session('2024-08-26', '2024-08-27')
+
+        self.assertEqual(get_event_day(date(2023, 8, 28)), 'day_1')
+        self.assertEqual(get_event_day(date(2023, 9, 1)), 'day_5')
+        self.assertEqual(get_event_day(date(2024, 8, 27)), 'day_2')
+        self.assertIsNone(get_event_day(date(2023, 9, 2)))
+
+    def test_calendar_is_cached_and_rebuilt_on_session_save(self):
+        """test lookups are served from memory until a session changes"""
+        session = sample_session('2023-08-28', '2023-08-30')
+        get_event_day(date(2023, 8, 28))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_event_day(date(2023, 8, 29)), 'day_2')
+
+        session.start_date = date(2023, 8, 29)
+        session.save()
+
+        self.assertEqual(get_event_day(date(2023, 8, 29)), 'day_1')
+
+    def test_weekends_are_not_event_days(self):
+        """test a session spanning a weekend skips it when numbering days"""
+        sample_session('2023-08-31', '2023-09-06')
+
+        self.assertEqual(get_event_day(date(2023, 9, 1)), 'day_2')
+        self.assertIsNone(get_event_day(date(2023, 9, 2)))
+        self.assertIsNone(get_event_day(date(2023, 9, 3)))
+        self.assertEqual(get_event_day(date(2023, 9, 4)), 'day_3')
+        self.assertEqual(get_event_day(date(2023, 9, 6)), 'day_5')
+
+    def test_event_days_are_not_limited(self):
+        """test sessions of any length get an event day for every weekday"""
+        sample_session('2023-08-28', '2023-09-08')
+
+        self.assertEqual(get_event_day(date(2023, 9, 4)), 'day_6')
+        self.assertEqual(get_event_day(date(2023, 9, 8)), 'day_10')
+
+    def test_session_ending_before_it_starts_is_invalid(self):
+        """test a session's end date may not precede its start date"""
+        session = models.Session(
+            name='Afternoon', description='VBS session',
+            start_date=date(2023, 9, 1), end_date=date(2023, 8, 31),
+        )
+        with self.assertRaises(ValidationError):
+            session.clean()
+
+        session.end_date = date(2023, 9, 1)
+        session.clean()
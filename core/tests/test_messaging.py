@@ -0,0 +1,128 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import models
+from core.messaging import (
+    SMSDeliveryError,
+    deliver_queued_messages,
+    outbox_batch_size,
+    queue_bulk_sms,
+    queue_sms,
+    send_sms,
+)
+
+
+@override_settings(SMS_MAX_ATTEMPTS=2, SMS_RETRY_BACKOFF=30, SMS_RATE_LIMIT=0)
+class OutboxTests(TestCase):
+
+    @patch('core.messaging.send_bulk_sms')
+    def test_deliver_queued_message(self, send_sms):
+        """test a queued message is sent and marked as delivered"""
+        outbound = queue_sms('0244123456', 'Hello')
+
+        self.assertEqual(deliver_queued_messages(), 1)
+
+        send_sms.assert_called_once_with(
+            phone_numbers=['0244123456'], message='Hello')
+        outbound.refresh_from_db()
+        self.assertEqual(outbound.status, models.SENT)
+        self.assertEqual(outbound.attempts, 1)
+        self.assertIsNotNone(outbound.sent_at)
+
+    @patch('core.messaging.send_bulk_sms', side_effect=SMSDeliveryError('down'))
+    def test_failed_delivery_is_retried_with_backoff(self, send_sms):
+        """test a failed message is rescheduled and finally marked failed"""
+        outbound = queue_sms('0244123456', 'Hello')
+
+        self.assertEqual(deliver_queued_messages(), 0)
+        outbound.refresh_from_db()
+        self.assertEqual(outbound.status, models.PENDING)
+        self.assertEqual(outbound.last_error, 'down')
+        self.assertGreater(
+            outbound.next_attempt_at, timezone.now() + timedelta(seconds=25))
+
+        # not due yet, so it is left alone
+        deliver_queued_messages()
+        self.assertEqual(send_sms.call_count, 1)
+
+        models.OutboundMessage.objects.update(next_attempt_at=timezone.now())
+        deliver_queued_messages()
+        outbound.refresh_from_db()
+        self.assertEqual(outbound.status, models.FAILED)
+        self.assertEqual(outbound.attempts, 2)
+
+    @override_settings(SMS_BATCH_SIZE=2)
+    @patch('core.messaging.send_bulk_sms')
+    def test_identical_messages_are_coalesced(self, send_sms):
+        """test messages with the same text share multi-recipient calls"""
+        queue_bulk_sms(['0201', '0202', '0203', '0201'], 'Reminder')
+        queue_sms('0204', 'Hello')
+
+        self.assertEqual(deliver_queued_messages(), 4)
+
+        calls = [call.kwargs for call in send_sms.call_args_list]
+        self.assertEqual(calls, [
+            {'phone_numbers': ['0201', '0202'], 'message': 'Reminder'},
+            {'phone_numbers': ['0203'], 'message': 'Reminder'},
+            {'phone_numbers': ['0204'], 'message': 'Hello'},
+        ])
+        self.assertFalse(
+            models.OutboundMessage.objects.exclude(status=models.SENT).exists())
+
+    @patch('core.messaging.get_session')
+    def test_gateway_error_raises_delivery_error(self, get_session):
+        """test an unsuccessful gateway response raises SMSDeliveryError"""
+        get_session.return_value.post.return_value.json.return_value = {
+            'status': 'error'}
+        with self.assertRaises(SMSDeliveryError):
+            send_sms('0244123456', 'Hello')
+
+    @override_settings(SMS_BATCH_SIZE=1)
+    @patch('core.messaging.send_bulk_sms', side_effect=[None, RuntimeError('crash')])
+    def test_crash_keeps_delivered_messages_sent(self, send_sms):
+        """test a crash mid-batch keeps earlier sends and leases the rest"""
+        first = queue_sms('0201', 'Hello')
+        second = queue_sms('0202', 'Hello')
+
+        with self.assertRaises(RuntimeError):
+            deliver_queued_messages()
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, models.SENT)
+        self.assertEqual(second.status, models.PENDING)
+        self.assertGreater(second.next_attempt_at, timezone.now())
+
+        # the leased message is not picked up again before the lease ends
+        self.assertEqual(deliver_queued_messages(), 0)
+        self.assertEqual(send_sms.call_count, 2)
+
+    @patch('core.messaging.get_session')
+    def test_unexpected_gateway_response_raises_delivery_error(self, get_session):
+        """test a gateway response that is not an object raises SMSDeliveryError"""
+        get_session.return_value.post.return_value.json.return_value = ['ok']
+        with self.assertRaises(SMSDeliveryError):
+            send_sms('0244123456', 'Hello')
+
+    @override_settings(SMS_BATCH_SIZE=1, SMS_SEND_BUDGET=0)
+    @patch('core.messaging.send_bulk_sms')
+    def test_messages_past_the_send_budget_are_released(self, send_sms):
+        """test messages left when the send budget runs out are due again"""
+        outbound = queue_sms('0201', 'Hello')
+
+        self.assertEqual(deliver_queued_messages(), 0)
+
+        send_sms.assert_not_called()
+        outbound.refresh_from_db()
+        self.assertEqual(outbound.status, models.PENDING)
+        self.assertLessEqual(outbound.next_attempt_at, timezone.now())
+
+    def test_batch_size_fits_rate_limit_and_send_budget(self):
+        """test the default batch is what the rate limit allows in the budget"""
+        with self.settings(SMS_RATE_LIMIT=10, SMS_SEND_BUDGET=40):
+            self.assertEqual(outbox_batch_size(), 400)
+        with self.settings(SMS_RATE_LIMIT=0.5, SMS_SEND_BUDGET=1):
+            self.assertEqual(outbox_batch_size(), 1)
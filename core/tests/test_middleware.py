@@ -0,0 +1,104 @@
+import gzip
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.db.utils import OperationalError
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from core import middleware
+from core.middleware import CompressionMiddleware
+
+BODY = b'{"first_name": "Adoma", "last_name": "Asomaning"}' * 100
+
+
+def compress(body, accept_encoding, etag=None, path='/api/participants/',
+             content_type='application/json'):
+    def get_response(request):
+        response = HttpResponse(body, content_type=content_type)
+        if etag:
+            response['ETag'] = etag
+        return response
+
+    request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING=accept_encoding)
+    return CompressionMiddleware(get_response)(request)
+
+
+@override_settings(COMPRESSION_MIN_SIZE=1024)
+class CompressionMiddlewareTests(SimpleTestCase):
+
+    def test_small_responses_are_not_compressed(self):
+        """Test responses under the threshold are sent as they are"""
+        response = compress(BODY[:1000], 'gzip, br')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, BODY[:1000])
+
+    def test_gzip(self):
+        """Test large responses are gzipped for clients accepting gzip"""
+        response = compress(BODY, 'gzip', etag='"abc"')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_identity(self):
+        """Test clients not accepting compression get the plain body"""
+        response = compress(BODY, '')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_pages_outside_the_api_are_not_compressed(self):
+        """Test admin pages are sent uncompressed"""
+        response = compress(
+            BODY, 'gzip, br', path='/admin/core/participant/',
+            content_type='text/html')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, BODY)
+
+    def test_html_api_responses_are_not_compressed(self):
+        """Test browsable API pages are sent uncompressed"""
+        response = compress(BODY, 'gzip, br', content_type='text/html; charset=utf-8')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    @skipIf(middleware.brotli is None, 'brotli is not installed')
+    def test_brotli(self):
+        """Test brotli is preferred when the client accepts it"""
+        response = compress(BODY, 'gzip, deflate, br', etag='"abc"')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(middleware.brotli.decompress(response.content), BODY)
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+
+class HealthCheckMiddlewareTests(TestCase):
+
+    def test_healthz(self):
+        """Test the liveness probe answers without checking the host"""
+        response = self.client.get('/healthz', HTTP_HOST='10.0.0.12')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok'})
+        self.assertEqual(response['Cache-Control'], 'no-store')
+
+    def test_readyz(self):
+        """Test the readiness probe reports the database round trip"""
+        response = self.client.get('/readyz', HTTP_HOST='10.0.0.12')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'ok')
+        self.assertIn('latency_ms', response.json()['database'])
+
+    @patch('core.middleware.ping_database', side_effect=OperationalError('refused'))
+    def test_readyz_database_unavailable(self, ping):
+        """Test the readiness probe fails while the database is down"""
+        response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(
+            response.json(),
+            {'status': 'unavailable', 'database': {'error': 'refused'}}
+        )
+
+    @override_settings(READYZ_MAX_DB_LATENCY=100)
+    @patch('core.middleware.ping_database', return_value=0.25)
+    def test_readyz_database_slow(self, ping):
+        """Test the readiness probe fails while the database is too slow"""
+        response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['status'], 'degraded')
+        self.assertEqual(response.json()['database']['latency_ms'], 250)
@@ -0,0 +1,47 @@
+from datetime import date
+
+from django.db import IntegrityError
+from django.test import TestCase
+
+from core import models
+from core.pickup_codes import (
+    CODE_SPACE,
+    allocate_pickup_codes,
+    permute,
+)
+
+
+class PickupCodeTests(TestCase):
+
+    def test_permutation_is_collision_free(self):
+        """test every position maps to a distinct code"""
+        codes = {permute(index) for index in range(CODE_SPACE)}
+        self.assertEqual(len(codes), CODE_SPACE)
+
+    def test_allocated_codes_are_unique(self):
+        """test codes handed out in a row never repeat"""
+        codes = allocate_pickup_codes(500)
+        codes += allocate_pickup_codes(500)
+
+        self.assertEqual(len(set(codes)), 1000)
+        self.assertTrue(all(len(code) == 5 for code in codes))
+
+    def test_duplicate_code_on_same_date_is_rejected(self):
+        """test the database refuses to reuse a code on the same date"""
+        grade = models.Grade.objects.create(name='Class 1')
+        first, second = (
+            models.Participant.objects.create(
+                first_name='Adoma', last_name='Asomaning', age=8, grade=grade)
+            for _ in range(2)
+        )
+        models.AttendanceEvent.objects.create(
+            participant=first, event_date=date(2022, 8, 29),
+            kind=models.ADMISSION, pickup_code='12345')
+        models.AttendanceEvent.objects.create(
+            participant=second, event_date=date(2022, 8, 30),
+            kind=models.ADMISSION, pickup_code='12345')
+
+        with self.assertRaises(IntegrityError):
+            models.AttendanceEvent.objects.create(
+                participant=second, event_date=date(2022, 8, 29),
+                kind=models.ADMISSION, pickup_code='12345')
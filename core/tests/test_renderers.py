@@ -0,0 +1,45 @@
+import uuid
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from unittest import skipIf
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from core import renderers
+from core.renderers import ORJSONRenderer
+
+DATA = {
+    'id': 1,
+    'name': 'Adoma Asomaning Ɛsi',
+    'created': datetime(2022, 8, 29, 8, 15, 30, 123456, tzinfo=timezone.utc),
+    'date_of_birth': date(2014, 1, 1),
+    'time': time(8, 15),
+    'amount': Decimal('12.50'),
+    'uuid': uuid.UUID('12345678123456781234567812345678'),
+    'label': gettext_lazy('Pickup'),
+    'counts': {1: 2},
+    'results': [None, True, 1.5],
+}
+
+
+@skipIf(renderers.orjson is None, 'orjson is not installed')
+class ORJSONRendererTests(SimpleTestCase):
+
+    def test_output_matches_json_renderer(self):
+        """Test orjson output is byte for byte the stdlib renderer's"""
+        self.assertEqual(
+            ORJSONRenderer().render(DATA), JSONRenderer().render(DATA))
+
+    def test_indented_output(self):
+        """Test indented output falls back to the stdlib renderer"""
+        context = {'indent': 4}
+        self.assertEqual(
+            ORJSONRenderer().render(DATA, renderer_context=context),
+            JSONRenderer().render(DATA, renderer_context=context),
+        )
+
+    def test_empty_body(self):
+        """Test no data renders an empty body"""
+        self.assertEqual(ORJSONRenderer().render(None), b'')
@@ -0,0 +1,50 @@
+import importlib
+import subprocess
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from core.management.commands.benchmark_startup import parse_importtime
+
+IMPORTTIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   encodings.aliases
+import time:       300 |        400 | encodings
+import time:      2000 |       2000 |     django.utils
+import time:       500 |       2500 |   django.conf
+import time:      1000 |       3500 | vbs_registration.wsgi
+"""
+
+
+class StartupTests(SimpleTestCase):
+
+    def test_api_settings_leave_out_admin(self):
+        """test the API profile does not load the admin or static files"""
+        api_settings = importlib.import_module('settings.api')
+        for app in ('django.contrib.admin', 'django.contrib.staticfiles',
+                    'admin_export_action'):
+            self.assertNotIn(app, api_settings.INSTALLED_APPS)
+        self.assertIn('participant', api_settings.INSTALLED_APPS)
+        self.assertNotIn(
+            'whitenoise.middleware.WhiteNoiseMiddleware', api_settings.MIDDLEWARE)
+        self.assertEqual(api_settings.ROOT_URLCONF, 'vbs_registration.api_urls')
+
+    def test_parse_importtime(self):
+        """test import times are totalled from the top level imports"""
+        total, self_times = parse_importtime(IMPORTTIME_OUTPUT)
+        self.assertEqual(total, 3900)
+        self.assertEqual(len(self_times), 5)
+        self.assertEqual(self_times['django.utils'], 2000)
+
+    @patch('core.management.commands.benchmark_startup.subprocess.run')
+    def test_benchmark_startup(self, run):
+        """test the benchmark boots each settings module in a fresh interpreter"""
+        run.return_value = subprocess.CompletedProcess([], 0, '', IMPORTTIME_OUTPUT)
+        out = StringIO()
+        call_command('benchmark_startup', 'settings.api', runs=2, top=1, stdout=out)
+        self.assertEqual(run.call_count, 2)
+        self.assertEqual(
+            run.call_args[1]['env']['DJANGO_SETTINGS_MODULE'], 'settings.api')
+        self.assertIn('settings.api: 3.9 ms to import 5 modules', out.getvalue())
+        self.assertIn('django.utils', out.getvalue())
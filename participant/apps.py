@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ParticipantConfig(AppConfig):
     name = 'participant'
+
+    def ready(self):
+        from participant import signals  # noqa
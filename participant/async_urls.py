@@ -0,0 +1,24 @@
+from django.urls import path, re_path
+
+from participant import async_views
+
+app_name = "participant"
+
+# async check-in endpoints, served by the ASGI worker only
+urlpatterns = [
+    path(
+        "async/participants/<int:id>/admit/",
+        async_views.admit,
+        name="async-admit",
+    ),
+    path(
+        "async/participants/<int:id>/pickup/",
+        async_views.pickup,
+        name="async-pickup",
+    ),
+    re_path(
+        r"^async/participants/by-pickup-code/(?P<code>\d{5})/$",
+        async_views.by_pickup_code,
+        name="async-by-pickup-code",
+    ),
+]
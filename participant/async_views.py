@@ -0,0 +1,105 @@
+"""
+Async variants of the check-in endpoints for the ASGI entry point.
+
+Under ASGI, Django 3.2 runs DRF's sync views one at a time on a single
+shared thread. These views accept the request on the event loop and run
+the check-in in the database thread pool, so one worker handles many gate
+devices at once while each waits on PostgreSQL. Django 3.2 has no async
+ORM, so the queries themselves stay sync. Responses match the REST
+actions of ParticipantViewset.
+"""
+import functools
+import json
+
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import exceptions, status
+
+from core.db import database_sync_to_async
+from core.models import Participant
+from participant.idempotency import idempotent_response
+from participant.views import admit_response, pickup_code_response, pickup_response
+from user.authentication import CachedTokenAuthentication
+
+
+def async_api_view(*methods):
+    """
+    Turn a sync view into an async one that requires a valid token.
+
+    The wrapped view runs in the database thread pool with request.user
+    set. Errors use DRF's {"detail": ...} bodies, and the views are CSRF
+    exempt like DRF's since token auth is not cookie based.
+    """
+
+    def decorator(view):
+        def api_view(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            try:
+                user_auth = CachedTokenAuthentication().authenticate(request)
+            except exceptions.AuthenticationFailed as e:
+                return JsonResponse(
+                    {"detail": e.detail}, status=status.HTTP_401_UNAUTHORIZED
+                )
+            if user_auth is None:
+                return JsonResponse(
+                    {"detail": "Authentication credentials were not provided."},
+                    status=status.HTTP_401_UNAUTHORIZED,
+                )
+            request.user = user_auth[0]
+            try:
+                return view(request, *args, **kwargs)
+            except Http404:
+                return JsonResponse(
+                    {"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND
+                )
+
+        run_in_pool = database_sync_to_async(api_view)
+
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            return await run_in_pool(request, *args, **kwargs)
+
+        wrapper.csrf_exempt = True
+        return wrapper
+
+    return decorator
+
+
+def request_data(request):
+    """Return the JSON or form body of a request"""
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    return request.POST
+
+
+@async_api_view("POST")
+def admit(request, id):
+    return idempotent_response(
+        request,
+        lambda: admit_response(
+            functools.partial(get_object_or_404, Participant, id=id), request.user
+        ),
+    )
+
+
+@async_api_view("POST")
+def pickup(request, id):
+    return idempotent_response(
+        request,
+        lambda: pickup_response(
+            functools.partial(get_object_or_404, Participant, id=id),
+            request.user,
+            request_data(request).get("pickup_person"),
+        ),
+    )
+
+
+@async_api_view("GET")
+def by_pickup_code(request, code):
+    """Return the participant holding today's pickup code"""
+    return pickup_code_response(code, JsonResponse)
@@ -0,0 +1,99 @@
+from datetime import date
+
+from django.db import IntegrityError, transaction
+
+from core.messaging import (
+    attendance_message,
+    queue_messages,
+    send_attendance_message,
+    send_pickup_message,
+)
+from core.models import ADMISSION, PICKUP, AttendanceEvent
+from core.pickup_codes import (
+    allocate_pickup_code,
+    allocate_pickup_codes,
+    index_pickup_codes,
+)
+
+
+def record_event(participant, kind, actor, pickup_person=None, pickup_code=None):
+    """
+    Insert today's admission or pickup event for a participant.
+
+    Returns False when the event has already been recorded today. The
+    unique (participant, event_date, kind) constraint makes the insert
+    the only check needed: when two devices scan the same child at once
+    exactly one insert succeeds, so only one code and SMS are issued.
+    """
+    try:
+        with transaction.atomic():
+            AttendanceEvent.objects.create(
+                participant=participant,
+                event_date=date.today(),
+                kind=kind,
+                actor=actor if actor.is_authenticated else None,
+                pickup_person=pickup_person,
+                pickup_code=pickup_code,
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+def admit_participant(participant, event_day, actor):
+    """
+    Record an admission with its pickup code and queue the parent SMS.
+
+    Returns False when the participant was already admitted today. The
+    code is drawn before the insert, codes are unique per date by
+    construction so the admission is stored in one statement; a code drawn
+    for a duplicate scan is simply never used.
+    """
+    pickup_code = allocate_pickup_code()
+    with transaction.atomic():
+        if not record_event(participant, ADMISSION, actor, pickup_code=pickup_code):
+            return False
+        send_attendance_message(
+            participant=participant, vbs_day=event_day, pickup_code=pickup_code
+        )
+        transaction.on_commit(lambda: index_pickup_codes({participant.id: pickup_code}))
+    return True
+
+
+def pickup_participant(participant, event_day, actor, pickup_person=None):
+    """
+    Record a pickup and queue the parent SMS.
+
+    Returns False when the participant was already picked up today.
+    """
+    with transaction.atomic():
+        if not record_event(participant, PICKUP, actor, pickup_person=pickup_person):
+            return False
+        send_pickup_message(
+            participant=participant, vbs_day=event_day, pickup_person=pickup_person
+        )
+    return True
+
+
+def issue_pickup_codes(participants, event_day, events):
+    """
+    Allocate and text pickup codes for today's unsaved admission events.
+
+    `participants` maps ids to Participant instances. The codes are set on
+    the events before they are bulk inserted, allocated in one pass, the
+    parent messages are queued together and the code index is updated on
+    commit. Returns a participant id -> code dict.
+    """
+    events = [event for event in events if event.kind == ADMISSION]
+    for event, code in zip(events, allocate_pickup_codes(len(events))):
+        event.pickup_code = code
+    pickup_codes = {event.participant_id: event.pickup_code for event in events}
+    queue_messages(
+        (
+            participants[participant_id].primary_contact_no,
+            attendance_message(participants[participant_id], event_day, code),
+        )
+        for participant_id, code in pickup_codes.items()
+    )
+    transaction.on_commit(lambda: index_pickup_codes(pickup_codes))
+    return pickup_codes
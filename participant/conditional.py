@@ -0,0 +1,53 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def etag_matches(request, etag):
+    """
+    Return whether the request's If-None-Match holds `etag`
+
+    Uses the weak comparison, compression turns our ETags into weak ones.
+    """
+    for tag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+        if tag == "*" or (tag[2:] if tag.startswith("W/") else tag) == etag:
+            return True
+    return False
+
+
+class ConditionalListMixin:
+    """
+    Answer list requests with 304 when nothing in the table changed.
+
+    The ETag combines the row count and max(modified) of the whole table
+    with the request's query string, so any insert, update or delete
+    changes every list ETag while an unchanged roster costs one aggregate
+    query. Requests with ?include= or ?q= are not cached, their extra data
+    and the pickup codes ?q= matches do not live in the table's version.
+    Neither are ?modified_since= polls, which carry deletions and a
+    high-water mark.
+    """
+
+    def list_etag(self, request):
+        version = self.get_queryset().model.objects.aggregate(
+            count=Count("pk"), modified=Max("modified")
+        )
+        state = f"{version['count']}:{version['modified']}:{request.get_full_path()}"
+        return quote_etag(hashlib.md5(state.encode()).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        if any(
+            request.query_params.get(param)
+            for param in ("include", "q", "modified_since")
+        ):
+            return super().list(request, *args, **kwargs)
+        etag = self.list_etag(request)
+        if etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().list(request, *args, **kwargs)
+        response["ETag"] = etag
+        return response
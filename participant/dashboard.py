@@ -0,0 +1,74 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.http import quote_etag
+
+from core.models import Participant, Volunteer
+
+DASHBOARD_CACHE_KEY = "dashboard_data"
+
+
+def overview_counts(model):
+    """
+    Count all rows, distinct churches and this week's share in one query
+    """
+    year, week, _ = timezone.now().isocalendar()
+    this_week = Q(created__iso_year=year, created__week=week)
+    return model.objects.aggregate(
+        total=Count("id"),
+        churches=Count("church", distinct=True),
+        this_week=Count("id", filter=this_week),
+        churches_this_week=Count("church", distinct=True, filter=this_week),
+    )
+
+
+def build_dashboard_data():
+    participants = overview_counts(Participant)
+    volunteers = overview_counts(Volunteer)
+    return {
+        "overview": {
+            "participants": participants["total"],
+            "volunteers": volunteers["total"],
+            "participant_churches": participants["churches"],
+            "volunteer_churches": volunteers["churches"],
+            "participants_this_week": participants["this_week"],
+            "volunteers_this_week": volunteers["this_week"],
+            "participant_churches_this_week": participants["churches_this_week"],
+            "volunteer_churches_this_week": volunteers["churches_this_week"],
+        },
+        "distributions": {
+            "participant_class_distribution": list(
+                Participant.objects.values("grade").annotate(count=Count("grade"))
+            ),
+            "volunteer_class_distribution": list(
+                Volunteer.objects.values("preferred_class").annotate(
+                    count=Count("preferred_class")
+                )
+            ),
+        },
+    }
+
+
+def get_dashboard_data():
+    """
+    Return (data, etag) for the dashboard, cached for DASHBOARD_CACHE_TIMEOUT
+    seconds or until a participant or volunteer changes
+    """
+    cached = cache.get(DASHBOARD_CACHE_KEY)
+    if cached is None:
+        data = build_dashboard_data()
+        digest = hashlib.md5(
+            json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True).encode()
+        ).hexdigest()
+        cached = (data, quote_etag(digest))
+        cache.set(DASHBOARD_CACHE_KEY, cached, settings.DASHBOARD_CACHE_TIMEOUT)
+    return cached
+
+
+def invalidate_dashboard_data():
+    cache.delete(DASHBOARD_CACHE_KEY)
@@ -0,0 +1,123 @@
+"""
+Full exports streamed row by row from a server-side cursor.
+
+Only WSGI servers such as gunicorn pass the stream on as it is produced.
+serverless-wsgi buffers the whole response in the Lambda function.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from core.models import ADMISSION, PICKUP, AttendanceEvent, Participant, Volunteer
+
+# resource name -> (queryset, exported columns). Columns are fetched with
+# values_list so rows are streamed as tuples without building model instances.
+EXPORT_RESOURCES = {
+    "participants": (
+        Participant.objects.all(),
+        (
+            "id",
+            "first_name",
+            "last_name",
+            "gender",
+            "age",
+            "date_of_birth",
+            "grade_id",
+            "church",
+            "parent_name",
+            "primary_contact_no",
+            "alternate_contact_no",
+            "whatsApp_no",
+            "email",
+            "pickup_person_name",
+            "pickup_person_contact_no",
+            "medical_info",
+            "created",
+            "modified",
+        ),
+    ),
+    "volunteers": (
+        Volunteer.objects.all(),
+        (
+            "id",
+            "first_name",
+            "last_name",
+            "gender",
+            "preferred_role",
+            "preferred_class",
+            "church",
+            "contact_no",
+            "whatsApp_no",
+            "email",
+            "previous_volunteer",
+            "previous_site",
+            "created",
+            "modified",
+        ),
+    ),
+    "attendance": (
+        AttendanceEvent.objects.filter(kind=ADMISSION),
+        (
+            "participant_id",
+            "participant__first_name",
+            "participant__last_name",
+            "participant__grade_id",
+            "event_date",
+            "timestamp",
+            "actor__email",
+        ),
+    ),
+    "pickups": (
+        AttendanceEvent.objects.filter(kind=PICKUP),
+        (
+            "participant_id",
+            "participant__first_name",
+            "participant__last_name",
+            "participant__grade_id",
+            "event_date",
+            "timestamp",
+            "actor__email",
+            "pickup_person",
+        ),
+    ),
+}
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object that hands back what is written, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(resource):
+    """stream the rows of a resource through a server-side cursor"""
+    queryset, columns = EXPORT_RESOURCES[resource]
+    return (
+        queryset.order_by("pk")
+        .values_list(*columns)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def stream_csv(resource):
+    _, columns = EXPORT_RESOURCES[resource]
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in export_rows(resource):
+        yield writer.writerow(row)
+
+
+def stream_ndjson(resource):
+    _, columns = EXPORT_RESOURCES[resource]
+    for row in export_rows(resource):
+        yield json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+EXPORT_FORMATS = {
+    "csv": (stream_csv, "text/csv"),
+    "ndjson": (stream_ndjson, "application/x-ndjson"),
+}
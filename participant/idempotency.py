@@ -0,0 +1,62 @@
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# answers that ask the client to try again, they are not final outcomes
+RETRY_STATUS_CODES = (409, 429)
+
+
+def idempotency_cache_key(request, key):
+    digest = hashlib.sha256(
+        f"{request.user.pk}:{request.method}:{request.path}:{key}".encode()
+    ).hexdigest()
+    return f"idempotency:{digest}"
+
+
+def idempotent(view_method):
+    """
+    Replay the stored response when a request repeats its Idempotency-Key.
+
+    Gate devices resend check-ins over flaky Wi-Fi, a retry with the same key
+    is answered from the cache without touching the database. Server errors,
+    conflicts and throttled requests are not stored so they can be retried.
+    """
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        return idempotent_response(
+            request, lambda: view_method(self, request, *args, **kwargs)
+        )
+
+    return wrapper
+
+
+def idempotent_response(request, get_response):
+    """Return the stored response for a repeated key or store a new one"""
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not key:
+        return get_response()
+
+    cache_key = idempotency_cache_key(request, key)
+    stored = cache.get(cache_key)
+    if stored is not None:
+        status_code, content, content_type = stored
+        response = HttpResponse(
+            content, status=status_code, content_type=content_type
+        )
+        response["Idempotent-Replayed"] = "true"
+        return response
+
+    response = get_response()
+    if response.status_code < 500 and response.status_code not in RETRY_STATUS_CODES:
+        cache.set(
+            cache_key,
+            (response.status_code, response.content, response["Content-Type"]),
+            settings.IDEMPOTENCY_KEY_TTL,
+        )
+    return response
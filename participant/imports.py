@@ -0,0 +1,176 @@
+import csv
+import io
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from core.models import Grade, Participant
+from participant.dashboard import invalidate_dashboard_data
+
+# Columns read from an import file, matching the participant export so an
+# export can be edited and loaded back. id, created and modified are ignored.
+IMPORT_COLUMNS = (
+    "first_name",
+    "last_name",
+    "gender",
+    "age",
+    "date_of_birth",
+    "grade",
+    "church",
+    "parent_name",
+    "primary_contact_no",
+    "alternate_contact_no",
+    "whatsApp_no",
+    "email",
+    "pickup_person_name",
+    "pickup_person_contact_no",
+    "medical_info",
+)
+COLUMN_ALIASES = {"grade_id": "grade"}
+
+IMPORT_MAX_ROWS = 5000
+IMPORT_BATCH_SIZE = 500
+
+GRADE_NAMES_CACHE_KEY = "grade_names"
+GRADE_NAMES_TIMEOUT = 60 * 60
+
+
+class ImportFormatError(Exception):
+    """Raised when an import file cannot be read"""
+
+
+def parse_csv(upload):
+    try:
+        yield from csv.DictReader(io.TextIOWrapper(upload, encoding="utf-8-sig"))
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise ImportFormatError(f"Invalid CSV file: {e}") from e
+
+
+def parse_ndjson(upload):
+    try:
+        for line in io.TextIOWrapper(upload, encoding="utf-8"):
+            if line.strip():
+                yield json.loads(line)
+    except ValueError as e:
+        raise ImportFormatError(f"Invalid NDJSON file: {e}") from e
+
+
+def parse_xlsx(upload):
+    # openpyxl is only needed for spreadsheet uploads
+    from openpyxl import load_workbook
+
+    try:
+        sheet = load_workbook(upload, read_only=True, data_only=True).active
+    except Exception as e:
+        raise ImportFormatError(f"Invalid spreadsheet: {e}") from e
+    rows = sheet.iter_rows(values_only=True)
+    header = [str(cell or "").strip() for cell in next(rows, ())]
+    for row in rows:
+        if any(cell not in (None, "") for cell in row):
+            yield dict(zip(header, row))
+
+
+IMPORT_FORMATS = {
+    "csv": parse_csv,
+    "ndjson": parse_ndjson,
+    "xlsx": parse_xlsx,
+}
+
+
+def grade_names():
+    """Return the set of grade names, cached until a grade changes"""
+    return cache.get_or_set(
+        GRADE_NAMES_CACHE_KEY,
+        lambda: set(Grade.objects.values_list("name", flat=True)),
+        GRADE_NAMES_TIMEOUT,
+    )
+
+
+def reload_grade_names():
+    """Read the grade names from the database and cache them again"""
+    names = set(Grade.objects.values_list("name", flat=True))
+    cache.set(GRADE_NAMES_CACHE_KEY, names, GRADE_NAMES_TIMEOUT)
+    return names
+
+
+def invalidate_grade_names():
+    cache.delete(GRADE_NAMES_CACHE_KEY)
+
+
+def clean_row(record, grades):
+    """
+    Convert a raw record to model field values.
+
+    Returns (values, errors). Cells are cleaned with the model fields
+    themselves, so types, lengths, choices and emails are checked without
+    building a serializer per row; grades are checked against `grades`.
+    """
+    record = {
+        COLUMN_ALIASES.get(str(key).strip(), str(key).strip()): value
+        for key, value in record.items()
+        if key is not None
+    }
+    values, errors = {}, {}
+    for column in IMPORT_COLUMNS:
+        field = Participant._meta.get_field(column)
+        value = record.get(column)
+        if isinstance(value, str):
+            value = value.strip()
+        if value in (None, ""):
+            if field.has_default():
+                values[field.attname] = field.get_default()
+                continue
+            value = None if field.null else ""
+        if column == "grade":
+            if value not in grades:
+                errors[column] = [f'Unknown grade "{value}".']
+            else:
+                values[field.attname] = value
+            continue
+        try:
+            values[field.attname] = field.clean(value, None)
+        except ValidationError as e:
+            errors[column] = e.messages
+    return values, errors
+
+
+def import_participants(records):
+    """
+    Validate and load participant records, all or nothing.
+
+    Returns (created, errors) where errors lists {"row", "errors"} entries
+    with rows counted from 1, excluding any header row. Nothing is saved
+    when a row is invalid. Valid files are loaded with batched multi-row
+    INSERTs.
+    """
+    grades = grade_names()
+    reloaded = False
+    participants, errors = [], []
+    for row, record in enumerate(records, start=1):
+        if row > IMPORT_MAX_ROWS:
+            raise ImportFormatError(
+                f"Import files are limited to {IMPORT_MAX_ROWS} rows."
+            )
+        if not isinstance(record, dict):
+            errors.append({"row": row, "errors": {"row": ["Expected an object."]}})
+            continue
+        values, row_errors = clean_row(record, grades)
+        if "grade" in row_errors and not reloaded:
+            # the cached names may predate a grade added through another
+            # process, whose cache was the only one invalidated
+            grades = reload_grade_names()
+            reloaded = True
+            values, row_errors = clean_row(record, grades)
+        if row_errors:
+            errors.append({"row": row, "errors": row_errors})
+        else:
+            participants.append(Participant(**values))
+    if errors:
+        return 0, errors
+    with transaction.atomic():
+        Participant.objects.bulk_create(participants, batch_size=IMPORT_BATCH_SIZE)
+    # bulk_create does not send post_save
+    invalidate_dashboard_data()
+    return len(participants), []
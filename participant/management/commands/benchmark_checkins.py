@@ -0,0 +1,170 @@
+import asyncio
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from rest_framework.authtoken.models import Token
+
+from core.event_calendar import clear_event_calendar
+from core.models import Grade, Participant, Session
+
+
+class Command(BaseCommand):
+    """
+    django command to load test admits through the WSGI and ASGI workers
+
+    Compares the REST admit on WSGI with the async admit on ASGI, each with
+    the URL configuration its worker serves. Runs against a throwaway test
+    database. Every query is delayed by --latency milliseconds to stand in
+    for the network round trip to a managed database, which is what a
+    check-in spends most of its time on.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--concurrency', type=int, default=20,
+            help='Admits in flight at once on the ASGI worker'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=min(32, (os.cpu_count() or 1) + 4),
+            help='Database threads of the ASGI worker, asyncio\'s default pool size'
+        )
+        parser.add_argument(
+            '--latency', type=float, default=2,
+            help='Milliseconds added to every query'
+        )
+
+    def handle(self, *args, **options):
+        sync_middleware = [
+            path for path in settings.MIDDLEWARE
+            if not getattr(import_string(path), 'async_capable', False)
+        ]
+        if sync_middleware:
+            self.stderr.write(
+                f'{", ".join(sync_middleware)} is sync only and serialises ASGI '
+                f'requests, run with --settings settings.asgi'
+            )
+
+        def add_latency(execute, sql, params, many, context):
+            time.sleep(options['latency'] / 1000)
+            return execute(sql, params, many, context)
+
+        def on_connection_created(connection, **kwargs):
+            connection.execute_wrappers.append(add_latency)
+
+        self.threads = options['threads']
+        old_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        connection_created.connect(on_connection_created)
+        try:
+            connection.close()
+            token = self.setup_event()
+            runs = (
+                ('WSGI, REST admit', self.run_wsgi, 'vbs_registration.api_urls',
+                 'participant:participant-admit', 1),
+                ('ASGI, async admit', self.run_asgi, 'vbs_registration.asgi_urls',
+                 'participant:async-admit', options['concurrency']),
+            )
+            for label, run, urlconf, url_name, concurrency in runs:
+                with override_settings(ROOT_URLCONF=urlconf):
+                    urls = [
+                        reverse(url_name, kwargs={'id': participant_id})
+                        for participant_id in self.create_participants(options['requests'])
+                    ]
+                    start = time.perf_counter()
+                    results = run(urls, token, concurrency)
+                    elapsed = time.perf_counter() - start
+                failed = [status for status, _ in results if status != 200]
+                if failed:
+                    raise CommandError(f'{label}: {len(failed)} admits failed, status {failed[0]}')
+                timings = [timing for _, timing in results]
+                self.stdout.write(
+                    f'{label:<18} concurrency {concurrency:>3}  '
+                    f'{len(urls) / elapsed:7.1f} admits/s  '
+                    f'p50 {statistics.median(timings):7.1f} ms'
+                )
+        finally:
+            connection_created.disconnect(on_connection_created)
+            connection.close()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            clear_event_calendar()
+
+    def setup_event(self):
+        today = date.today()
+        Session.objects.create(name='Benchmark', start_date=today, end_date=today)
+        clear_event_calendar()
+        user = get_user_model().objects.create_user('benchmark@example.com', 'benchmark')
+        return Token.objects.create(user=user).key
+
+    def create_participants(self, count):
+        grade, _ = Grade.objects.get_or_create(name='Class 1')
+        participants = Participant.objects.bulk_create(
+            Participant(
+                first_name='Adoma', last_name='Asomaning', age=8, grade=grade,
+                primary_contact_no='0244123456',
+            )
+            for _ in range(count)
+        )
+        return [participant.id for participant in participants]
+
+    def run_wsgi(self, urls, token, concurrency):
+        # a sync gunicorn worker answers one request at a time
+        client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+        results = []
+        for url in urls:
+            start = time.perf_counter()
+            response = client.post(url)
+            results.append((response.status_code, (time.perf_counter() - start) * 1000))
+        return results
+
+    def run_asgi(self, urls, token, concurrency):
+        client = AsyncClient()
+
+        async def admit(url, slots):
+            async with slots:
+                start = time.perf_counter()
+                response = await client.post(url, authorization=f'Token {token}')
+                return response.status_code, (time.perf_counter() - start) * 1000
+
+        async def admit_all():
+            loop = asyncio.get_running_loop()
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=self.threads))
+            slots = asyncio.Semaphore(concurrency)
+            try:
+                return await asyncio.gather(*(admit(url, slots) for url in urls))
+            finally:
+                await self.close_connections(loop)
+
+        return asyncio.run(admit_all())
+
+    async def close_connections(self, loop):
+        """Close the persistent connections of every thread sync code ran on"""
+        await sync_to_async(connections.close_all, thread_sensitive=True)()
+        # the barrier holds each pool thread until all of them have a task,
+        # so every thread closes its own connection
+        barrier = threading.Barrier(self.threads)
+
+        def close_all():
+            barrier.wait()
+            connections.close_all()
+
+        await asyncio.gather(*(
+            loop.run_in_executor(None, close_all) for _ in range(self.threads)
+        ))
@@ -0,0 +1,66 @@
+import timeit
+import tracemalloc
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from core import renderers
+from core.models import Participant
+from participant.projections import get_projection
+
+
+class Command(BaseCommand):
+    """django command to compare render time and memory of the JSON renderers"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        now = timezone.now()
+        projection = get_projection(Participant)
+        names = projection.parse_fields(None)
+        values = {
+            'id': 0, 'first_name': 'Adoma', 'last_name': 'Asomaning',
+            'gender': 'Female', 'age': 8, 'date_of_birth': date(2014, 1, 1),
+            'grade_id': 'Class 1', 'church': 'Legon Interdenominational Church',
+            'parent_name': 'Aforo Asomaning',
+            'primary_contact_no': '0244123456',
+            'alternate_contact_no': '0244123456', 'whatsApp_no': None,
+            'email': 'aforo@gmail.com', 'pickup_person_name': None,
+            'pickup_person_contact_no': None, 'medical_info': None,
+            'created': now, 'modified': now,
+        }
+        # a page as the participant list renders it
+        page = {
+            'count': rows,
+            'next': None,
+            'previous': None,
+            'results': projection.render(
+                [dict(values, id=i) for i in range(rows)], names
+            ),
+        }
+
+        candidates = {'JSONRenderer': JSONRenderer()}
+        if renderers.orjson is None:
+            self.stdout.write('orjson is not installed, ORJSONRenderer '
+                              'falls back to JSONRenderer')
+        else:
+            candidates['ORJSONRenderer'] = renderers.ORJSONRenderer()
+
+        for label, renderer in candidates.items():
+            best = min(timeit.repeat(
+                lambda: renderer.render(page), number=1,
+                repeat=options['repeat'],
+            ))
+            tracemalloc.start()
+            size = len(renderer.render(page))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.stdout.write(
+                f'{label:<15} {best * 1000:7.2f} ms '
+                f'peak {peak / 1024:8.1f} KiB ({size} bytes, {rows} rows)'
+            )
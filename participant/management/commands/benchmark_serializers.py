@@ -0,0 +1,55 @@
+import timeit
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import Grade, Participant
+from participant.projections import get_projection
+from participant.serializers import ParticipantSerializer
+
+
+class Command(BaseCommand):
+    """django command to compare per-row cost of the list serializers"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        now = timezone.now()
+        grade = Grade(name='Class 1')
+        # in-memory rows, so only serialization is measured
+        participants = [
+            Participant(
+                id=i, first_name='Adoma', last_name='Asomaning',
+                gender='Female', age=8, date_of_birth=date(2014, 1, 1),
+                grade=grade, church='Legon Interdenominational Church',
+                parent_name='Aforo Asomaning', primary_contact_no='0244123456',
+                alternate_contact_no='0244123456', email='aforo@gmail.com',
+                created=now, modified=now,
+            )
+            for i in range(rows)
+        ]
+        projection = get_projection(Participant)
+        names = projection.parse_fields(None)
+        values = [
+            {
+                column: getattr(participant, column)
+                for column in projection.columns(names)
+            }
+            for participant in participants
+        ]
+
+        timings = {
+            'ModelSerializer': lambda: ParticipantSerializer(
+                participants, many=True).data,
+            'values() projection': lambda: projection.render(values, names),
+        }
+        for label, run in timings.items():
+            best = min(timeit.repeat(run, number=1, repeat=options['repeat']))
+            self.stdout.write(
+                f'{label:<20} {best * 1e6 / rows:8.1f} us/row '
+                f'({best * 1000:.1f} ms for {rows} rows)'
+            )
@@ -0,0 +1,98 @@
+import json
+from base64 import b64decode, b64encode
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def keyset_filter(ordering, position):
+    """
+    Return a filter for the rows after `position` in `ordering`.
+
+    All ordering fields must share one direction. The leading >= (or <=)
+    bound lets PostgreSQL start the index scan at the cursor instead of
+    filtering from the first row.
+    """
+    lookup = "lt" if ordering[0].startswith("-") else "gt"
+    fields = [field.lstrip("-") for field in ordering]
+    condition = Q()
+    for i, field in enumerate(fields):
+        condition |= Q(
+            **{f"{field}__{lookup}": position[i]},
+            **dict(zip(fields[:i], position[:i])),
+        )
+    return Q(**{f"{fields[0]}__{lookup}e": position[0]}) & condition
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page number pagination with an opt-in keyset mode.
+
+    Passing ``?cursor=`` (empty for the first page) switches to keyset
+    pagination over the view's ``keyset_ordering``, views setting
+    ``keyset_only`` always use it. Pages are fetched with a range condition
+    on the last row seen instead of COUNT and OFFSET, so deep pages cost the
+    same as the first one.
+    """
+
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = (
+            self.cursor_query_param in request.query_params
+            or getattr(view, "keyset_only", False)
+        )
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        ordering = view.keyset_ordering
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(keyset_filter(ordering, position))
+        rows = list(queryset[: page_size + 1])
+        self.next_position = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            self.next_position = [
+                last[field.lstrip("-")] if isinstance(last, dict)
+                else getattr(last, field.lstrip("-"))
+                for field in ordering
+            ]
+        return rows
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            return json.loads(b64decode(encoded.encode("ascii")).decode("utf-8"))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        # isoformat keeps the microseconds of datetime positions
+        position = json.dumps(self.next_position, default=lambda value: value.isoformat())
+        encoded = b64encode(position.encode("utf-8"))
+        return replace_query_param(
+            url, self.cursor_query_param, encoded.decode("ascii")
+        )
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({"next": self.get_next_link(), "results": data})
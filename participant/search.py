@@ -0,0 +1,49 @@
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import Q
+from django.db.models.functions import Greatest, Lower
+
+from core.models import AttendanceEvent
+
+# Every field is covered by a GIN trigram index on UPPER(field), which is
+# what icontains compiles to on PostgreSQL, so these filters do not need a
+# sequential scan (see core migration 0017).
+PARTICIPANT_SEARCH_FIELDS = (
+    "first_name",
+    "last_name",
+    "parent_name",
+    "primary_contact_no",
+    "alternate_contact_no",
+)
+
+
+def participant_search_filter(q):
+    """return a filter matching participants whose names or numbers contain q"""
+    condition = Q()
+    for field in PARTICIPANT_SEARCH_FIELDS:
+        condition |= Q(**{f"{field}__icontains": q})
+    return condition
+
+
+def pickup_code_filter(q, event_date):
+    """
+    return a filter matching the participant admitted with pickup code q
+
+    The holder is looked up on its own, on the unique (event_date,
+    pickup_code) index of the admissions. OR-ing a join to the events
+    into the trigram filter made PostgreSQL scan every participant instead.
+    """
+    if not (q.isdigit() and len(q) == 5):
+        return Q()
+    holders = AttendanceEvent.objects.filter(
+        event_date=event_date, pickup_code=q
+    ).values_list("participant_id", flat=True)
+    return Q(pk__in=list(holders))
+
+
+def rank_participants(queryset, q):
+    """order participants by their best trigram similarity to q"""
+    return queryset.annotate(
+        rank=Greatest(
+            *(TrigramSimilarity(field, q) for field in PARTICIPANT_SEARCH_FIELDS)
+        )
+    ).order_by("-rank", Lower("first_name"))
@@ -1,4 +1,6 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
+from rest_framework.fields import get_error_detail
 
 from core.models import (
     Grade,
@@ -39,6 +41,18 @@ class SessionSerializer(serializers.ModelSerializer):
         fields = "__all__"
         read_only_fields = ("id",)
 
+    def validate(self, attrs):
+        """run Session.clean, which checks the session dates"""
+        session = Session(
+            start_date=attrs.get("start_date", getattr(self.instance, "start_date", None)),
+            end_date=attrs.get("end_date", getattr(self.instance, "end_date", None)),
+        )
+        try:
+            session.clean()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(get_error_detail(e))
+        return attrs
+
 
 class ChurchSerializer(serializers.ModelSerializer):
     """Serializer for church model"""
@@ -73,3 +87,32 @@ class VolunteerSerializer(serializers.ModelSerializer):
         model = Volunteer
         fields = "__all__"
         read_only_fields = ("id",)
+
+
+class BulkCheckInSerializer(serializers.Serializer):
+    """Serializer for admitting or picking up several participants at once"""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=500
+    )
+    pickup_person = serializers.CharField(required=False)
+
+
+class SyncEventSerializer(serializers.Serializer):
+    """Serializer for an admission or pickup recorded offline by a device"""
+
+    id = serializers.CharField(max_length=64)
+    participant = serializers.IntegerField()
+    kind = serializers.ChoiceField(choices=("admit", "pickup"))
+    timestamp = serializers.DateTimeField()
+    pickup_person = serializers.CharField(
+        max_length=150, required=False, allow_null=True, allow_blank=True
+    )
+
+
+class SyncEventsSerializer(serializers.Serializer):
+    """Serializer for a batch of offline events uploaded by a device"""
+
+    events = serializers.ListField(
+        child=SyncEventSerializer(), allow_empty=False, max_length=500
+    )
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Grade, Participant, Volunteer
+from participant.dashboard import invalidate_dashboard_data
+from participant.imports import invalidate_grade_names
+
+
+@receiver(post_save, sender=Participant)
+@receiver(post_delete, sender=Participant)
+@receiver(post_save, sender=Volunteer)
+@receiver(post_delete, sender=Volunteer)
+def refresh_dashboard_data(sender, **kwargs):
+    """drop the cached dashboard when registrations change"""
+    invalidate_dashboard_data()
+
+
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+def refresh_grade_names(sender, **kwargs):
+    """drop the cached grade names used to validate imports"""
+    invalidate_grade_names()
@@ -0,0 +1,191 @@
+import hashlib
+from datetime import date
+from typing import Dict, List, Optional
+
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.http import quote_etag
+
+from core.event_calendar import get_event_day
+from core.messaging import pickup_message, queue_messages
+from core.models import ADMISSION, PICKUP, AttendanceEvent, Participant
+from participant.checkin import issue_pickup_codes
+
+# Offline check-in for gate tablets: a device downloads the roster once,
+# checks children in against its local copy and uploads the events it
+# recorded whenever it has a connection.
+
+SNAPSHOT_COLUMNS = (
+    "id",
+    "first_name",
+    "last_name",
+    "grade",
+    "pickup_code",
+    "admitted",
+    "picked_up",
+)
+
+SYNC_EVENT_KINDS = {"admit": ADMISSION, "pickup": PICKUP}
+
+
+def snapshot_version(today: Optional[date] = None) -> str:
+    """
+    Return a token that changes whenever the roster or today's check-ins do.
+
+    Costs two aggregate queries, so devices can poll it cheaply and only
+    download the roster again when it changed.
+    """
+    today = today or date.today()
+    participants = Participant.objects.aggregate(
+        count=Count("id"), modified=Max("modified")
+    )
+    events = AttendanceEvent.objects.filter(event_date=today).aggregate(
+        count=Count("id"), last=Max("id")
+    )
+    state = (
+        f"{participants['count']}:{participants['modified']}:"
+        f"{events['count']}:{events['last']}:{today}:{get_event_day(today)}"
+    )
+    return quote_etag(hashlib.md5(state.encode()).hexdigest())
+
+
+def build_snapshot(today: Optional[date] = None) -> Dict:
+    """
+    Return the compact roster a device needs to check children in offline.
+
+    Rows are lists in SNAPSHOT_COLUMNS order. The pickup code is the one
+    issued with today's admission.
+    """
+    today = today or date.today()
+    event_day = get_event_day(today)
+    pickup_codes = {}
+    picked_up = set()
+    for participant_id, kind, pickup_code in AttendanceEvent.objects.filter(
+        event_date=today
+    ).values_list("participant_id", "kind", "pickup_code"):
+        if kind == ADMISSION:
+            pickup_codes[participant_id] = pickup_code
+        else:
+            picked_up.add(participant_id)
+
+    rows = []
+    for row in Participant.objects.order_by("id").values_list(
+        "id", "first_name", "last_name", "grade_id"
+    ):
+        participant_id = row[0]
+        rows.append(
+            [
+                *row,
+                pickup_codes.get(participant_id),
+                participant_id in pickup_codes,
+                participant_id in picked_up,
+            ]
+        )
+    return {
+        "date": today,
+        "event_day": event_day,
+        "columns": SNAPSHOT_COLUMNS,
+        "rows": rows,
+    }
+
+
+def apply_sync_events(events: List[Dict], actor) -> List[Dict]:
+    """
+    Record a batch of offline admit/pickup events and return one result each.
+
+    Must run inside a transaction. Statuses are:
+
+    * applied: the event was recorded
+    * duplicate: an event with this client id was already recorded
+    * conflict: the participant already has this event for the day,
+      e.g. from another device; the recorded timestamp is returned
+    * not_found: the participant does not exist
+    * invalid_date: the event was not recorded on an event day
+
+    Codes are issued and parents are texted only for today's events, a
+    message about an earlier day would only confuse them.
+    """
+    today = date.today()
+    client_ids = [event["id"] for event in events]
+    seen_client_ids = set(
+        AttendanceEvent.objects.filter(
+            client_event_id__in=client_ids
+        ).values_list("client_event_id", flat=True)
+    )
+    participants = Participant.objects.in_bulk(
+        {event["participant"] for event in events}
+    )
+    event_dates = {timezone.localdate(event["timestamp"]) for event in events}
+    recorded_events = AttendanceEvent.objects.filter(
+        participant_id__in=participants, event_date__in=event_dates
+    ).values_list("participant_id", "event_date", "kind", "timestamp")
+    recorded = {
+        (participant_id, event_date, kind): timestamp
+        for participant_id, event_date, kind, timestamp in recorded_events
+    }
+
+    results = []
+    new_events = []
+    for event in events:
+        result = {"id": event["id"]}
+        results.append(result)
+        event_date = timezone.localdate(event["timestamp"])
+        kind = SYNC_EVENT_KINDS[event["kind"]]
+        key = (event["participant"], event_date, kind)
+        if event["id"] in seen_client_ids:
+            result["status"] = "duplicate"
+        elif event["participant"] not in participants:
+            result["status"] = "not_found"
+        elif get_event_day(event_date) is None:
+            result["status"] = "invalid_date"
+        elif key in recorded:
+            result["status"] = "conflict"
+            result["recorded_at"] = recorded[key]
+        else:
+            result["status"] = "applied"
+            recorded[key] = event["timestamp"]
+            new_events.append(
+                AttendanceEvent(
+                    participant_id=event["participant"],
+                    event_date=event_date,
+                    kind=kind,
+                    timestamp=event["timestamp"],
+                    actor=actor if actor.is_authenticated else None,
+                    pickup_person=event.get("pickup_person"),
+                    client_event_id=event["id"],
+                )
+            )
+        seen_client_ids.add(event["id"])
+
+    today_event = get_event_day(today)
+    admitted = [
+        new_event
+        for new_event in new_events
+        if new_event.kind == ADMISSION and new_event.event_date == today
+    ]
+    pickup_codes = (
+        issue_pickup_codes(participants, today_event, admitted)
+        if admitted
+        else {}
+    )
+    AttendanceEvent.objects.bulk_create(new_events)
+    queue_messages(
+        (
+            participants[new_event.participant_id].primary_contact_no,
+            pickup_message(
+                participants[new_event.participant_id],
+                today_event,
+                new_event.pickup_person,
+            ),
+        )
+        for new_event in new_events
+        if new_event.kind == PICKUP and new_event.event_date == today
+    )
+    for result, event in zip(results, events):
+        if (
+            result["status"] == "applied"
+            and SYNC_EVENT_KINDS[event["kind"]] == ADMISSION
+            and event["participant"] in pickup_codes
+        ):
+            result["pickup_code"] = pickup_codes[event["participant"]]
+    return results
@@ -0,0 +1,158 @@
+import asyncio
+from unittest.mock import patch
+
+import freezegun as freezegun
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from core.event_calendar import clear_event_calendar
+from core.models import (
+    ADMISSION,
+    PICKUP,
+    AttendanceEvent,
+    OutboundMessage,
+    Session,
+)
+from participant.tests.test_participant_api import sample_grade, sample_participant
+
+
+def get_admit_url(participant_id):
+    return reverse('participant:async-admit', kwargs={'id': participant_id})
+
+
+def get_pickup_url(participant_id):
+    return reverse('participant:async-pickup', kwargs={'id': participant_id})
+
+
+def get_pickup_code_url(code):
+    return reverse('participant:async-by-pickup-code', kwargs={'code': code})
+
+
+@override_settings(ROOT_URLCONF='vbs_registration.asgi_urls')
+class AsyncCheckInApiTests(TransactionTestCase):
+    """Tests for the async check-in endpoints
+
+    The views run their queries on pool threads with their own database
+    connections, so test data has to be committed.
+    """
+
+    def setUp(self):
+        # pool threads close their connections after each call, so none are
+        # left open when the test database is dropped
+        patcher = patch.dict(connection.settings_dict, {'CONN_MAX_AGE': 0})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        clear_event_calendar()
+        cache.clear()
+        self.user = get_user_model().objects.create_user("user@company.com", "testpass")
+        self.token = Token.objects.create(user=self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+        Session.objects.create(
+            name="VBS 2022",
+            description="Main session",
+            start_date="2022-08-29",
+            end_date="2022-09-02",
+        )
+
+    def test_requires_token(self):
+        """Test the async endpoints reject unauthenticated requests"""
+        participant = sample_participant()
+        res = self.client.post(get_admit_url(participant.id))
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        res = self.client.post(
+            get_admit_url(participant.id), HTTP_AUTHORIZATION='Token invalid'
+        )
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(AttendanceEvent.objects.exists())
+
+    def test_method_not_allowed(self):
+        """Test admit only accepts POST"""
+        participant = sample_participant()
+        res = self.client.get(get_admit_url(participant.id), **self.auth)
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_rest_api_is_not_served(self):
+        """Test the ASGI worker leaves the REST API and exports to WSGI"""
+        participant = sample_participant()
+        for url in (
+            f'/api/participants/{participant.id}/admit/',
+            '/api/exports/participants.csv',
+        ):
+            res = self.client.post(url, **self.auth)
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @freezegun.freeze_time("2022-08-29")
+    def test_admit_pickup_and_lookup(self):
+        """Test a full check-in through the async endpoints"""
+        participant = sample_participant()
+
+        res = self.client.post(get_admit_url(participant.id), **self.auth)
+        self.assertEqual(res.json(), {"detail": "Attendance recorded successfully"})
+        res = self.client.post(get_admit_url(participant.id), **self.auth)
+        self.assertEqual(
+            res.json()["detail"],
+            "This participant has already been marked as present for today.",
+        )
+
+        code = AttendanceEvent.objects.get(kind=ADMISSION).pickup_code
+        res = self.client.get(get_pickup_code_url(code), **self.auth)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["id"], participant.id)
+
+        res = self.client.post(
+            get_pickup_url(participant.id),
+            {"pickup_person": "Aforo Asomaning"},
+            content_type="application/json",
+            **self.auth,
+        )
+        self.assertEqual(res.json(), {"detail": "Pickup recorded successfully"})
+        self.assertEqual(
+            AttendanceEvent.objects.get(kind=PICKUP).pickup_person, "Aforo Asomaning"
+        )
+        self.assertEqual(OutboundMessage.objects.count(), 2)
+
+    @freezegun.freeze_time("2022-08-29")
+    def test_unknown_participant(self):
+        """Test admitting a missing participant returns a JSON 404"""
+        res = self.client.post(get_admit_url(1234), **self.auth)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(res.json(), {"detail": "Not found."})
+
+    @freezegun.freeze_time("2022-08-28")
+    def test_admit_for_unsupported_day(self):
+        """Test admitting outside the event is rejected"""
+        participant = sample_participant()
+        res = self.client.post(get_admit_url(participant.id), **self.auth)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @freezegun.freeze_time("2022-08-29")
+    def test_concurrent_admits_over_asgi(self):
+        """Test concurrent ASGI admits each record one admission"""
+        grade = sample_grade()
+        participants = [
+            sample_participant(grade=grade, primary_contact_no=f"02441234{i:02}")
+            for i in range(5)
+        ]
+        client = AsyncClient()
+
+        async def admit_all():
+            return await asyncio.gather(*(
+                client.post(
+                    get_admit_url(participant.id),
+                    authorization=f'Token {self.token.key}',
+                )
+                for participant in participants
+            ))
+
+        responses = asyncio.run(admit_all())
+
+        self.assertEqual({res.status_code for res in responses}, {status.HTTP_200_OK})
+        self.assertEqual(AttendanceEvent.objects.filter(kind=ADMISSION).count(), 5)
+        self.assertEqual(
+            len(set(AttendanceEvent.objects.values_list("pickup_code", flat=True))), 5
+        )
@@ -0,0 +1,20 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+
+class CommandTests(SimpleTestCase):
+
+    def test_benchmark_serializers(self):
+        """Test the serializer benchmark reports both read paths"""
+        out = StringIO()
+        call_command('benchmark_serializers', rows=10, repeat=1, stdout=out)
+        self.assertIn('ModelSerializer', out.getvalue())
+        self.assertIn('values() projection', out.getvalue())
+
+    def test_benchmark_renderers(self):
+        """Test the renderer benchmark reports the stdlib renderer"""
+        out = StringIO()
+        call_command('benchmark_renderers', rows=10, repeat=1, stdout=out)
+        self.assertIn('JSONRenderer', out.getvalue())
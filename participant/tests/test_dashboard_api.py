@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Grade, Participant, Volunteer
+
+DASHBOARD_URL = reverse('participant:dashboard-list')
+
+
+def sample_participant(grade, church='Legon Interdenominational Church'):
+    return Participant.objects.create(
+        first_name='Adoma',
+        last_name='Asomaning',
+        age=8,
+        grade=grade,
+        church=church,
+    )
+
+
+class DashboardApiTests(TestCase):
+    """Tests for the dashboard data API"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            'user@company.com', 'testpass')
+        cls.grade = Grade.objects.create(name='Class 1')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_dashboard_overview(self):
+        """Test the overview is aggregated in one query per table"""
+        sample_participant(self.grade)
+        sample_participant(self.grade, church='Anglican Church')
+        Volunteer.objects.create(
+            first_name='Tsatsu',
+            last_name='Adogla-Bessa',
+            preferred_role='Teaching',
+            contact_no='0500018351',
+            gender='Male',
+            preferred_class='Pre-School',
+            church='Anglican Church',
+        )
+
+        # participant and volunteer overviews plus the two distributions
+        with self.assertNumQueries(4):
+            res = self.client.get(DASHBOARD_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['overview'], {
+            'participants': 2,
+            'volunteers': 1,
+            'participant_churches': 2,
+            'volunteer_churches': 1,
+            'participants_this_week': 2,
+            'volunteers_this_week': 1,
+            'participant_churches_this_week': 2,
+            'volunteer_churches_this_week': 1,
+        })
+        self.assertEqual(
+            res.data['distributions']['participant_class_distribution'],
+            [{'grade': 'Class 1', 'count': 2}]
+        )
+
+    def test_dashboard_is_cached_until_participants_change(self):
+        """Test repeat requests are served from cache until a write"""
+        self.client.get(DASHBOARD_URL)
+        with self.assertNumQueries(0):
+            self.client.get(DASHBOARD_URL)
+
+        sample_participant(self.grade)
+
+        res = self.client.get(DASHBOARD_URL)
+        self.assertEqual(res.data['overview']['participants'], 1)
+
+    def test_dashboard_not_modified(self):
+        """Test a matching If-None-Match returns 304"""
+        res = self.client.get(DASHBOARD_URL)
+        etag = res['ETag']
+
+        res = self.client.get(DASHBOARD_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        sample_participant(self.grade)
+        res = self.client.get(DASHBOARD_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
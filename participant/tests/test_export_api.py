@@ -0,0 +1,78 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import ADMISSION, AttendanceEvent, Grade, Participant
+
+
+def get_export_url(resource, fmt):
+    """return export URL for a resource and format"""
+    return reverse('participant:export',
+                   kwargs={'resource': resource, 'fmt': fmt}
+                   )
+
+
+class ExportApiTests(TestCase):
+    """Tests for the streaming export API"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = get_user_model().objects.create_superuser(
+            'admin@company.com', 'testpass')
+        grade = Grade.objects.create(name='Class 1')
+        cls.participant = Participant.objects.create(
+            first_name='Adoma',
+            last_name='Asomaning',
+            age=8,
+            grade=grade,
+        )
+        AttendanceEvent.objects.create(
+            participant=cls.participant,
+            event_date='2022-08-29',
+            kind=ADMISSION,
+            timestamp='2022-08-29T08:00:00Z',
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_export_participants_csv(self):
+        """Test participants are streamed as CSV with a header row"""
+        self.client.force_authenticate(self.staff)
+        res = self.client.get(get_export_url('participants', 'csv'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        lines = b''.join(res.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith('id,first_name,last_name'))
+        self.assertIn('Adoma', lines[1])
+
+    def test_export_attendance_ndjson(self):
+        """Test attendance is streamed as one JSON object per line"""
+        self.client.force_authenticate(self.staff)
+        res = self.client.get(get_export_url('attendance', 'ndjson'))
+
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in
+                b''.join(res.streaming_content).decode().splitlines()]
+        self.assertEqual(rows[0]['participant_id'], self.participant.id)
+        self.assertEqual(rows[0]['event_date'], '2022-08-29')
+        self.assertEqual(rows[0]['timestamp'], '2022-08-29T08:00:00Z')
+
+    def test_export_unknown_resource(self):
+        """Test exporting an unknown resource returns 404"""
+        self.client.force_authenticate(self.staff)
+        res = self.client.get(get_export_url('users', 'csv'))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_export_requires_staff(self):
+        """Test non staff users cannot export"""
+        user = get_user_model().objects.create_user('user@company.com', 'pass')
+        self.client.force_authenticate(user)
+        res = self.client.get(get_export_url('participants', 'csv'))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -1,14 +1,34 @@
+import threading
+from unittest.mock import patch
+
 import freezegun as freezegun
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.http import JsonResponse
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.models import Church, Grade, Participant
+from core.event_calendar import clear_event_calendar, get_event_day
+from core.models import (
+    ADMISSION,
+    PENDING,
+    PICKUP,
+    AttendanceEvent,
+    Church,
+    Grade,
+    OutboundMessage,
+    Participant,
+    Session,
+)
 from participant.serializers import ParticipantSerializer
 
 PARTICIPANT_URL = reverse('participant:participant-list')
+BULK_ADMIT_URL = reverse('participant:participant-bulk-admit')
+BULK_PICKUP_URL = reverse('participant:participant-bulk-pickup')
 
 
 def sample_church(name='Legon Interdenominational Church'):
@@ -39,14 +59,29 @@ def sample_participant(**params):
         "pickup_person_name": "Aforo Asomaning",
         "pickup_person_contact_no": "0244123456",
         "medical_info": "Allergic to pineapple",
-        "grade": sample_grade(),
     }
+    if "grade" not in params:
+        defaults["grade"] = sample_grade()
 
     defaults.update(params)
 
     return Participant.objects.create(**defaults)
 
 
+def get_pickup_code_url(code):
+    """return pickup code lookup URL"""
+    return reverse('participant:participant-by-pickup-code',
+                   kwargs={'code': code}
+                   )
+
+
+def get_pickup_code(participant):
+    """Return the code issued with a participant's admission"""
+    return AttendanceEvent.objects.get(
+        participant=participant, kind=ADMISSION
+    ).pickup_code
+
+
 def get_detail_url(participant_id):
     """return participant detail URL"""
     return reverse('participant:participant-detail',
@@ -60,8 +95,15 @@ class ParticipantsApiTests(TestCase):
     @classmethod
     def setUpTestData(cls):
         cls.user = get_user_model().objects.create_user("user@company.com", "testpass")
+        Session.objects.create(
+            name="VBS 2022",
+            description="Main session",
+            start_date="2022-08-29",
+            end_date="2022-09-02",
+        )
 
     def setUp(self):
+        clear_event_calendar()
         self.client = APIClient()
 
     def test_retrieve_participants_for_authenticated_user(self):
@@ -233,3 +275,481 @@ class ParticipantsApiTests(TestCase):
             res.json()["detail"],
             "You can only record attendance on a valid VBS date for this year",
         )
+
+    @freezegun.freeze_time("2022-08-29")
+    def test_admit_participant_queues_sms(self):
+        """Test admitting a participant queues the message instead of sending it"""
+        participant = sample_participant()
+        self.client.force_authenticate(self.user)
+        with patch("core.messaging.send_sms") as send_sms:
+            self.client.post(f"{get_detail_url(participant.id)}admit/")
+        send_sms.assert_not_called()
+        outbound = OutboundMessage.objects.get()
+        self.assertEqual(outbound.recipient, participant.primary_contact_no)
+        self.assertEqual(outbound.status, PENDING)
+
+    @freezegun.freeze_time("2022-08-29")
+    def test_admit_participant_query_count(self):
+        """Test admit runs a bounded number of queries"""
+        participant = sample_participant()
+        self.client.force_authenticate(self.user)
+        url = f"{get_detail_url(participant.id)}admit/"
+        get_event_day()  # the calendar is loaded once per process
+        # fetch, code allocation, savepoint, event insert (in its own
+        # savepoint), outbox insert, release savepoint
+        with self.assertNumQueries(8):
+            res = self.client.post(url)
+        self.assertEqual(res.json()["detail"], "Attendance recorded successfully")
+
+        with freezegun.freeze_time("2022-08-30"):
+            get_event_day()  # a day later the calendar TTL has expired
+            # the code is stored with the event, so every day costs the same
+            with self.assertNumQueries(8):
+                res = self.client.post(url)
+        self.assertEqual(res.json()["detail"], "Attendance recorded successfully")
+
+    @freezegun.freeze_time("2022-08-29")
+    def test_admit_participant_twice(self):
+        """Test admitting an already admitted participant is a no-op"""
+        participant = sample_participant()
+        self.client.force_authenticate(self.user)
+        url = f"{get_detail_url(participant.id)}admit/"
+        self.client.post(url)
+        code = get_pickup_code(participant)
+
+        res = self.client.post(url)
+
+        self.assertEqual(
+            res.json()["detail"],
+            "This participant has already been marked as present for today.",
+        )
+        self.assertEqual(get_pickup_code(participant), code)
+        self.assertEqual(OutboundMessage.objects.count(), 1)
+
+    @freezegun.freeze_time("2022-08-29")
+    def test_bulk_admit_participants(self):
+        """Test admitting several participants in one request"""
+        first = sample_participant()
+        second = sample_participant(first_name="Aba", grade=Grade.objects.get())
+        self.client.force_authenticate(self.user)
+        self.client.post(f"{get_detail_url(first.id)}admit/")
+
+        res = self.client.post(
+            BULK_ADMIT_URL, {"ids": [first.id, second.id, 0]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.json()["results"],
+            [
+                {"id": first.id, "status": "already_admitted"},
+                {"id": second.id, "status": "admitted"},
+                {"id": 0, "status": "not_found"},
+            ],
+        )
+        self.assertTrue(
+            AttendanceEvent.objects.filter(participant=second, kind=ADMISSION).exists()
+        )
+        self.assertTrue(get_pickup_code(second))
+        self.assertEqual(OutboundMessage.objects.count(), 2)
+
+    @freezegun.freeze_time("2022-08-29")
+    def test_bulk_admit_query_count_is_constant(self):
+        """Test bulk admit does not issue queries per participant"""
+        grade = sample_grade()
+        ids = [sample_participant(grade=grade).id for _ in range(10)]
+        self.client.force_authenticate(self.user)
+        get_event_day()  # the calendar is loaded once per process
+        # participants, savepoint, attendance lookup, code allocation, event
+        # insert, outbox insert, release savepoint
+        with self.assertNumQueries(7):
+            res = self.client.post(BULK_ADMIT_URL, {"ids": ids}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(AttendanceEvent.objects.count(), 10)
+
+    @freezegun.freeze_time("2022-08-29")
+    def test_bulk_pickup_participants(self):
+        """Test recording pickup for several participants in one request"""
+        first = sample_participant()
+        second = sample_participant(first_name="Aba", grade=Grade.objects.get())
+        self.client.force_authenticate(self.user)
+
+        res = self.client.post(
+            BULK_PICKUP_URL, {"ids": [first.id, second.id]}, format="json"
+        )
+        self.assertEqual(
+            [result["status"] for result in res.json()["results"]],
+            ["picked_up", "picked_up"],
+        )
+
+        res = self.client.post(BULK_PICKUP_URL, {"ids": [first.id]}, format="json")
+        self.assertEqual(res.json()["results"][0]["status"], "already_picked_up")
+        self.assertEqual(AttendanceEvent.objects.filter(kind=PICKUP).count(), 2)
+        self.assertEqual(OutboundMessage.objects.count(), 2)
+
+    @freezegun.freeze_time("2022-08-28")
+    def test_bulk_admit_for_unsupported_day(self):
+        participant = sample_participant()
+        self.client.force_authenticate(self.user)
+        res = self.client.post(BULK_ADMIT_URL, {"ids": [participant.id]}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @freezegun.freeze_time("2022-08-29")
+    def test_lookup_participant_by_pickup_code(self):
+        """Test resolving today's pickup code from the code index"""
+        cache.clear()
+        participant = sample_participant()
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"{get_detail_url(participant.id)}admit/")
+        code = get_pickup_code(participant)
+
+        # the code was indexed on admit, so only the participant is fetched
+        with self.assertNumQueries(1):
+            res = self.client.get(get_pickup_code_url(code))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["id"], participant.id)
+
+    @freezegun.freeze_time("2022-08-30")
+    def test_lookup_pickup_code_of_earlier_day(self):
+        """Test a code issued on an earlier day is not resolved today"""
+        cache.clear()
+        participant = sample_participant()
+        self.client.force_authenticate(self.user)
+        with freezegun.freeze_time("2022-08-29"):
+            clear_event_calendar()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(f"{get_detail_url(participant.id)}admit/")
+        code = get_pickup_code(participant)
+
+        res = self.client.get(get_pickup_code_url(code))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @freezegun.freeze_time("2022-08-29")
+    def test_lookup_unknown_pickup_code(self):
+        """Test looking up a code nobody holds today returns 404"""
+        cache.clear()
+        participant = sample_participant()
+        AttendanceEvent.objects.create(
+            participant=participant,
+            event_date="2022-08-30",
+            kind=ADMISSION,
+            pickup_code="12345",
+        )
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(get_pickup_code_url("12345"))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_search_participants_by_parent_and_contact(self):
+        """Test q matches parent names and contact numbers"""
+        grade = sample_grade()
+        kofi = sample_participant(first_name="Kofi", parent_name="Ama Mensah",
+                                  primary_contact_no="0209999999", grade=grade)
+        sample_participant(first_name="Esi", grade=grade)
+        self.client.force_authenticate(self.user)
+
+        for q in ("mensah", "0209999"):
+            res = self.client.get(PARTICIPANT_URL, {"q": q})
+            self.assertEqual(
+                [p["id"] for p in res.data["results"]], [kofi.id], q
+            )
+
+    @freezegun.freeze_time("2022-08-29")
+    def test_search_participants_by_pickup_code(self):
+        """Test q matches today's pickup code without joining the events"""
+        grade = sample_grade()
+        holder = sample_participant(first_name="Kofi", grade=grade)
+        sample_participant(first_name="Esi", primary_contact_no="0241234567", grade=grade)
+        AttendanceEvent.objects.create(
+            participant=holder,
+            event_date="2022-08-29",
+            kind=ADMISSION,
+            pickup_code="12345",
+        )
+        self.client.force_authenticate(self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(PARTICIPANT_URL, {"q": "12345"})
+
+        self.assertEqual(
+            sorted(p["first_name"] for p in res.data["results"]), ["Esi", "Kofi"]
+        )
+        self.assertNotIn("core_attendanceevent", queries.captured_queries[-1]["sql"])
+
+    def test_ranked_participant_search(self):
+        """Test rank=true orders results by similarity to q"""
+        grade = sample_grade()
+        partial = sample_participant(first_name="Annabelle", last_name="Owusu", grade=grade)
+        exact = sample_participant(first_name="Anna", last_name="Boateng", grade=grade)
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(PARTICIPANT_URL, {"q": "anna", "rank": "true"})
+
+        self.assertEqual(
+            [p["id"] for p in res.data["results"]], [exact.id, partial.id]
+        )
+
+    @patch("participant.pagination.KeysetPagination.page_size", 2)
+    def test_retrieve_participants_with_cursor(self):
+        """Test keyset pagination follows (lower(first_name), id) without COUNT"""
+        grade = sample_grade()
+        names = ["ama", "Ama", "Kofi", "esi", "Yaw"]
+        for name in names:
+            sample_participant(first_name=name, grade=grade)
+        self.client.force_authenticate(self.user)
+
+        seen = []
+        url = PARTICIPANT_URL
+        params = {"cursor": ""}
+        while url:
+            # the table version for the ETag, then a single SELECT per page
+            # with no COUNT(*) and no OFFSET
+            with self.assertNumQueries(2) as queries:
+                res = self.client.get(url, params)
+            page_sql = queries.captured_queries[-1]["sql"]
+            self.assertNotIn("COUNT", page_sql)
+            self.assertNotIn("OFFSET", page_sql)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            seen += [p["first_name"] for p in res.data["results"]]
+            url, params = res.data["next"], None
+
+        self.assertEqual(seen, ["ama", "Ama", "esi", "Kofi", "Yaw"])
+
+    def test_retrieve_participants_with_invalid_cursor(self):
+        """Test an undecodable cursor returns 404"""
+        self.client.force_authenticate(self.user)
+        res = self.client.get(PARTICIPANT_URL, {"cursor": "not-a-cursor"})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @freezegun.freeze_time("2022-08-29")
+    def test_pickup_participant_records_event(self):
+        """Test pickup appends a pickup event with the actor and pickup person"""
+        participant = sample_participant()
+        self.client.force_authenticate(self.user)
+        url = f"{get_detail_url(participant.id)}pickup/"
+
+        res = self.client.post(url, {"pickup_person": "Aforo Asomaning"})
+        self.assertEqual(res.json()["detail"], "Pickup recorded successfully")
+        event = AttendanceEvent.objects.get(participant=participant, kind=PICKUP)
+        self.assertEqual(str(event.event_date), "2022-08-29")
+        self.assertEqual(event.actor, self.user)
+        self.assertEqual(event.pickup_person, "Aforo Asomaning")
+
+        res = self.client.post(url)
+        self.assertEqual(res.status_code, 202)
+
+    @freezegun.freeze_time("2022-08-29")
+    def test_admit_replays_idempotent_retry(self):
+        """Test a retried admit with the same Idempotency-Key is a cached no-op"""
+        cache.clear()
+        participant = sample_participant()
+        self.client.force_authenticate(self.user)
+        url = f"{get_detail_url(participant.id)}admit/"
+        self.client.post(url, HTTP_IDEMPOTENCY_KEY="scan-1")
+
+        with self.assertNumQueries(0):
+            res = self.client.post(url, HTTP_IDEMPOTENCY_KEY="scan-1")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Idempotent-Replayed"], "true")
+        self.assertEqual(res.json()["detail"], "Attendance recorded successfully")
+        self.assertEqual(OutboundMessage.objects.count(), 1)
+
+    def test_admit_conflict_is_not_replayed(self):
+        """Test a 409 asking for a retry is not stored under the Idempotency-Key"""
+        cache.clear()
+        participant = sample_participant()
+        self.client.force_authenticate(self.user)
+        url = f"{get_detail_url(participant.id)}admit/"
+        conflict = JsonResponse(
+            {"detail": "Please retry."}, status=status.HTTP_409_CONFLICT
+        )
+        with patch("participant.views.admit_response", return_value=conflict):
+            res = self.client.post(url, HTTP_IDEMPOTENCY_KEY="scan-1")
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+        with freezegun.freeze_time("2022-08-29"):
+            res = self.client.post(url, HTTP_IDEMPOTENCY_KEY="scan-1")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(res.has_header("Idempotent-Replayed"))
+        self.assertEqual(res.json()["detail"], "Attendance recorded successfully")
+
+    def test_retrieve_participants_sparse_fields(self):
+        """Test ?fields= selects only the requested columns in one query"""
+        grade = sample_grade()
+        participant = sample_participant(grade=grade)
+        self.client.force_authenticate(self.user)
+
+        with self.assertNumQueries(3) as queries:
+            res = self.client.get(
+                PARTICIPANT_URL, {"fields": "id,first_name,grade,created"}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], [{
+            "id": participant.id,
+            "first_name": "Adoma",
+            "grade": grade.name,
+            "created": ParticipantSerializer(participant).data["created"],
+        }])
+        # table version, COUNT and the page, no joins and no unused columns
+        page_sql = queries.captured_queries[-1]["sql"]
+        self.assertNotIn("JOIN", page_sql)
+        self.assertNotIn("medical_info", page_sql)
+
+    @freezegun.freeze_time("2022-08-29 08:00")
+    def test_retrieve_participants_with_status(self):
+        """Test ?include=status adds today's check-in state in one query"""
+        grade = sample_grade()
+        admitted = sample_participant(first_name="Ama", grade=grade)
+        absent = sample_participant(first_name="Kofi", grade=grade)
+        AttendanceEvent.objects.create(
+            participant=absent,
+            event_date="2022-08-28",
+            kind=ADMISSION,
+            pickup_code="55555",
+        )
+        self.client.force_authenticate(self.user)
+        self.client.post(f"{get_detail_url(admitted.id)}admit/")
+        code = get_pickup_code(admitted)
+        get_event_day()
+
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                PARTICIPANT_URL,
+                {"fields": "id", "include": "status", "cursor": ""},
+            )
+
+        self.assertEqual(res.data["results"], [
+            {"id": admitted.id, "today": {
+                "admitted_at": "2022-08-29T08:00:00Z",
+                "picked_up_at": None,
+                "pickup_code": code,
+            }},
+            # a stale code from another year is not reported
+            {"id": absent.id, "today": {
+                "admitted_at": None, "picked_up_at": None, "pickup_code": None,
+            }},
+        ])
+
+    def test_retrieve_participants_unknown_include(self):
+        """Test requesting an unknown include returns 400"""
+        self.client.force_authenticate(self.user)
+        res = self.client.get(PARTICIPANT_URL, {"include": "everything"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_retrieve_participants_not_modified(self):
+        """Test an unchanged list is answered with 304 until a row changes"""
+        participant = sample_participant()
+        self.client.force_authenticate(self.user)
+        res = self.client.get(PARTICIPANT_URL)
+        etag = res["ETag"]
+
+        # only the table version is read for an unchanged roster
+        with self.assertNumQueries(1):
+            res = self.client.get(PARTICIPANT_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # compressed responses carry weak ETags, which match as well
+        res = self.client.get(PARTICIPANT_URL, HTTP_IF_NONE_MATCH=f"W/{etag}")
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        participant.last_name = "Mensah"
+        participant.save()
+        res = self.client.get(PARTICIPANT_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_search_participants_has_no_etag(self):
+        """Test searches are not answered with 304, codes may have changed"""
+        sample_participant()
+        self.client.force_authenticate(self.user)
+        res = self.client.get(PARTICIPANT_URL, {"q": "12345"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(res.has_header("ETag"))
+
+    def test_retrieve_participants_unknown_fields(self):
+        """Test requesting an unknown field returns 400"""
+        self.client.force_authenticate(self.user)
+        res = self.client.get(PARTICIPANT_URL, {"fields": "id,password"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_retrieve_participants_modified_since(self):
+        """Test delta sync returns changed and deleted rows with a high-water mark"""
+        grade = sample_grade()
+        self.client.force_authenticate(self.user)
+        with freezegun.freeze_time("2022-08-01 10:00"):
+            unchanged = sample_participant(first_name="Ama", grade=grade)
+            deleted = sample_participant(first_name="Esi", grade=grade)
+        with freezegun.freeze_time("2022-08-02 10:00"):
+            changed = sample_participant(first_name="Kofi", grade=grade)
+            deleted_id = deleted.id
+            deleted.delete()
+
+        with freezegun.freeze_time("2022-08-03 10:00"):
+            res = self.client.get(
+                PARTICIPANT_URL, {"modified_since": "2022-08-02T00:00:00Z"}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([p["id"] for p in res.data["results"]], [changed.id])
+        self.assertEqual(res.data["deleted"], [deleted_id])
+        self.assertEqual(
+            res.data["high_water_mark"].isoformat(), "2022-08-03T09:59:55+00:00"
+        )
+        self.assertNotIn(unchanged.id, [p["id"] for p in res.data["results"]])
+
+    def test_retrieve_participants_invalid_modified_since(self):
+        """Test an unparseable modified_since returns 400"""
+        self.client.force_authenticate(self.user)
+        res = self.client.get(PARTICIPANT_URL, {"modified_since": "yesterday"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConcurrentCheckInTests(TransactionTestCase):
+    """Tests for check-ins arriving from several gate devices at once"""
+
+    def setUp(self):
+        clear_event_calendar()
+        self.user = get_user_model().objects.create_user("user@company.com", "testpass")
+        Session.objects.create(
+            name="VBS 2022",
+            description="Main session",
+            start_date="2022-08-29",
+            end_date="2022-09-02",
+        )
+
+    @freezegun.freeze_time("2022-08-29")
+    def test_concurrent_admits_issue_one_code(self):
+        """Test two devices admitting the same child record it once"""
+        participant = sample_participant()
+        url = f"{get_detail_url(participant.id)}admit/"
+        barrier = threading.Barrier(2)
+        responses = []
+
+        def admit():
+            client = APIClient()
+            client.force_authenticate(self.user)
+            barrier.wait()
+            try:
+                responses.append(client.post(url).json()["detail"])
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=admit) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(responses), [
+            "Attendance recorded successfully",
+            "This participant has already been marked as present for today.",
+        ])
+        self.assertEqual(AttendanceEvent.objects.count(), 1)
+        self.assertEqual(OutboundMessage.objects.count(), 1)
@@ -0,0 +1,212 @@
+import freezegun
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.event_calendar import clear_event_calendar
+from core.models import (
+    ADMISSION,
+    PICKUP,
+    AttendanceEvent,
+    Grade,
+    OutboundMessage,
+    Participant,
+    Session,
+)
+
+SNAPSHOT_URL = reverse('participant:sync-snapshot')
+EVENTS_URL = reverse('participant:sync-events')
+
+
+def sample_participant(grade, first_name='Adoma'):
+    return Participant.objects.create(
+        first_name=first_name,
+        last_name='Asomaning',
+        age=8,
+        grade=grade,
+        parent_name='Aforo Asomaning',
+        primary_contact_no='0244123456',
+    )
+
+
+def sync_event(client_id, participant, kind='admit',
+               timestamp='2022-08-29T08:15:00Z', **params):
+    return {
+        'id': client_id,
+        'participant': participant.id,
+        'kind': kind,
+        'timestamp': timestamp,
+        **params,
+    }
+
+
+@freezegun.freeze_time('2022-08-29 10:00')
+class SyncApiTests(TestCase):
+    """Tests for the offline check-in sync API"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            'user@company.com', 'testpass')
+        cls.grade = Grade.objects.create(name='Class 1')
+        Session.objects.create(
+            name='VBS 2022',
+            description='Main session',
+            start_date='2022-08-29',
+            end_date='2022-09-02',
+        )
+
+    def setUp(self):
+        clear_event_calendar()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_sync_requires_authentication(self):
+        """Test the sync endpoints are not public"""
+        res = APIClient().get(SNAPSHOT_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_snapshot(self):
+        """Test the snapshot lists the roster with today's check-ins"""
+        admitted = sample_participant(self.grade)
+        absent = sample_participant(self.grade, first_name='Kofi')
+        self.client.post(EVENTS_URL, {
+            'events': [sync_event('tablet-1:1', admitted)],
+        }, format='json')
+
+        res = self.client.get(SNAPSHOT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['event_day'], 'day_1')
+        self.assertEqual(res.data['columns'][:4],
+                         ('id', 'first_name', 'last_name', 'grade'))
+        code = AttendanceEvent.objects.get(participant=admitted).pickup_code
+        self.assertEqual(res.data['rows'], [
+            [admitted.id, 'Adoma', 'Asomaning', self.grade.name,
+             code, True, False],
+            [absent.id, 'Kofi', 'Asomaning', self.grade.name,
+             None, False, False],
+        ])
+        self.assertEqual(res['ETag'], res.data['version'])
+
+    def test_snapshot_not_modified(self):
+        """Test an unchanged snapshot is answered with 304"""
+        participant = sample_participant(self.grade)
+        version = self.client.get(SNAPSHOT_URL)['ETag']
+
+        # only the version aggregates run for an unchanged roster
+        with self.assertNumQueries(2):
+            res = self.client.get(SNAPSHOT_URL, HTTP_IF_NONE_MATCH=version)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.post(EVENTS_URL, {
+            'events': [sync_event('tablet-1:1', participant)],
+        }, format='json')
+        res = self.client.get(SNAPSHOT_URL, HTTP_IF_NONE_MATCH=version)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], version)
+
+    def test_sync_events(self):
+        """Test offline events are recorded with their own timestamps"""
+        participant = sample_participant(self.grade)
+
+        res = self.client.post(EVENTS_URL, {
+            'events': [
+                sync_event('tablet-1:1', participant),
+                sync_event('tablet-1:2', participant, kind='pickup',
+                           timestamp='2022-08-29T09:30:00Z',
+                           pickup_person='Aforo Asomaning'),
+            ],
+        }, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        code = AttendanceEvent.objects.get(
+            participant=participant, kind=ADMISSION).pickup_code
+        self.assertEqual(res.data['results'], [
+            {'id': 'tablet-1:1', 'status': 'applied', 'pickup_code': code},
+            {'id': 'tablet-1:2', 'status': 'applied'},
+        ])
+        pickup = AttendanceEvent.objects.get(kind=PICKUP)
+        self.assertEqual(pickup.timestamp.isoformat(),
+                         '2022-08-29T09:30:00+00:00')
+        self.assertEqual(pickup.pickup_person, 'Aforo Asomaning')
+        self.assertEqual(pickup.client_event_id, 'tablet-1:2')
+        # one attendance and one pickup message for the parent
+        self.assertEqual(OutboundMessage.objects.count(), 2)
+
+    def test_sync_events_resent(self):
+        """Test resending a batch does not record or text anything twice"""
+        participant = sample_participant(self.grade)
+        payload = {'events': [sync_event('tablet-1:1', participant)]}
+        self.client.post(EVENTS_URL, payload, format='json')
+
+        res = self.client.post(EVENTS_URL, payload, format='json')
+
+        self.assertEqual(res.data['results'],
+                         [{'id': 'tablet-1:1', 'status': 'duplicate'}])
+        self.assertEqual(AttendanceEvent.objects.count(), 1)
+        self.assertEqual(OutboundMessage.objects.count(), 1)
+
+    def test_sync_events_conflict(self):
+        """Test an event another device already recorded is reported"""
+        participant = sample_participant(self.grade)
+        self.client.post(EVENTS_URL, {
+            'events': [sync_event('tablet-1:1', participant)],
+        }, format='json')
+
+        res = self.client.post(EVENTS_URL, {
+            'events': [sync_event('tablet-2:1', participant,
+                                  timestamp='2022-08-29T08:20:00Z')],
+        }, format='json')
+
+        result = res.data['results'][0]
+        self.assertEqual(result['status'], 'conflict')
+        self.assertEqual(result['recorded_at'].isoformat(),
+                         '2022-08-29T08:15:00+00:00')
+        self.assertEqual(
+            AttendanceEvent.objects.filter(kind=ADMISSION).count(), 1)
+
+    def test_sync_events_not_found_and_invalid_date(self):
+        """Test unknown participants and non event days are rejected"""
+        participant = sample_participant(self.grade)
+
+        res = self.client.post(EVENTS_URL, {
+            'events': [
+                {'id': 'tablet-1:1', 'participant': participant.id + 100,
+                 'kind': 'admit', 'timestamp': '2022-08-29T08:15:00Z'},
+                sync_event('tablet-1:2', participant,
+                           timestamp='2022-08-28T08:15:00Z'),
+            ],
+        }, format='json')
+
+        self.assertEqual([r['status'] for r in res.data['results']],
+                         ['not_found', 'invalid_date'])
+        self.assertFalse(AttendanceEvent.objects.exists())
+
+    def test_sync_events_from_an_earlier_day(self):
+        """Test events from an earlier day are recorded without texting"""
+        participant = sample_participant(self.grade)
+
+        with freezegun.freeze_time('2022-08-30 10:00'):
+            res = self.client.post(EVENTS_URL, {
+                'events': [sync_event('tablet-1:1', participant)],
+            }, format='json')
+
+        self.assertEqual(res.data['results'],
+                         [{'id': 'tablet-1:1', 'status': 'applied'}])
+        event = AttendanceEvent.objects.get()
+        self.assertEqual(str(event.event_date), '2022-08-29')
+        self.assertFalse(OutboundMessage.objects.exists())
+
+    def test_sync_events_invalid_payload(self):
+        """Test malformed events are rejected before anything is applied"""
+        participant = sample_participant(self.grade)
+
+        res = self.client.post(EVENTS_URL, {
+            'events': [sync_event('tablet-1:1', participant, kind='wave')],
+        }, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(AttendanceEvent.objects.exists())
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
@@ -184,3 +186,105 @@ class VolunteerTests(TestCase):
         url = get_detail_url(volunteer.id)
         res = self.client.get(url)
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @patch('participant.pagination.KeysetPagination.page_size', 2)
+    def test_retrieve_volunteers_with_cursor(self):
+        """Test paging through volunteers with keyset pagination"""
+        self.user = get_user_model().objects.create_user(
+            'user@email.com',
+            'password'
+        )
+        self.client.force_authenticate(self.user)
+        for first_name in ('Tsatsu', 'Hetty', 'Kojo'):
+            Volunteer.objects.create(
+                first_name=first_name,
+                last_name='Adogla-Bessa',
+                preferred_role='Teaching',
+                contact_no='0500018351',
+                gender='Male',
+                preferred_class='Pre-School',
+                church='Legon Interdenominational Church',
+            )
+
+        res = self.client.get(VOLUNTEER_URL, {'cursor': ''})
+        self.assertEqual(
+            [v['first_name'] for v in res.data['results']], ['Kojo', 'Hetty'])
+        self.assertNotIn('count', res.data)
+
+        res = self.client.get(res.data['next'])
+        self.assertEqual(
+            [v['first_name'] for v in res.data['results']], ['Tsatsu'])
+        self.assertIsNone(res.data['next'])
+
+    def test_retrieve_volunteers_modified_since(self):
+        """Test delta sync of volunteers includes deletions"""
+        self.user = get_user_model().objects.create_user(
+            'user@email.com',
+            'password'
+        )
+        self.client.force_authenticate(self.user)
+        volunteers = [
+            Volunteer.objects.create(
+                first_name=first_name,
+                last_name='Adogla-Bessa',
+                preferred_role='Teaching',
+                contact_no='0500018351',
+                gender='Male',
+                preferred_class='Pre-School',
+                church='Legon Interdenominational Church',
+            )
+            for first_name in ('Tsatsu', 'Hetty')
+        ]
+        res = self.client.get(VOLUNTEER_URL, {'modified_since': '2000-01-01T00:00:00Z'})
+        self.assertEqual(
+            [v['first_name'] for v in res.data['results']], ['Tsatsu', 'Hetty'])
+
+        deleted_id = volunteers[1].id
+        volunteers[1].delete()
+        res = self.client.get(
+            VOLUNTEER_URL, {'modified_since': res.data['high_water_mark']})
+        # rows inside the overlap window are sent again
+        self.assertEqual(
+            [v['first_name'] for v in res.data['results']], ['Tsatsu'])
+        self.assertEqual(res.data['deleted'], [deleted_id])
+
+    @patch('participant.pagination.KeysetPagination.page_size', 2)
+    def test_volunteers_modified_since_is_paginated(self):
+        """Test delta sync pages by keyset and sends deletions on the last page"""
+        self.user = get_user_model().objects.create_user(
+            'user@email.com',
+            'password'
+        )
+        self.client.force_authenticate(self.user)
+        volunteers = [
+            Volunteer.objects.create(
+                first_name=first_name,
+                last_name='Adogla-Bessa',
+                preferred_role='Teaching',
+                contact_no='0500018351',
+                gender='Male',
+                preferred_class='Pre-School',
+                church='Legon Interdenominational Church',
+            )
+            for first_name in ('Tsatsu', 'Hetty', 'Esi', 'Kofi')
+        ]
+        deleted_id = volunteers[3].id
+        volunteers[3].delete()
+
+        res = self.client.get(
+            VOLUNTEER_URL,
+            {'modified_since': '2000-01-01T00:00:00Z', 'fields': 'id,first_name'},
+        )
+        self.assertEqual(res.data['results'], [
+            {'id': volunteers[0].id, 'first_name': 'Tsatsu'},
+            {'id': volunteers[1].id, 'first_name': 'Hetty'},
+        ])
+        self.assertEqual(res.data['deleted'], [])
+        self.assertIsNotNone(res.data['next'])
+
+        res = self.client.get(res.data['next'])
+        self.assertEqual(
+            [v['first_name'] for v in res.data['results']], ['Esi'])
+        self.assertEqual(res.data['deleted'], [deleted_id])
+        self.assertIsNone(res.data['next'])
+        self.assertIn('high_water_mark', res.data)
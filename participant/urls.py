@@ -1,4 +1,4 @@
-from django.urls import path, include
+from django.urls import include, path
 
 from participant import views
 
@@ -14,6 +14,7 @@ router.register(
     "participants", views.ParticipantViewset, basename="participant"
 )
 router.register("volunteers", views.VolunteerViewSet, basename="volunteer")
+router.register("sync", views.SyncViewSet, basename="sync")
 router.register(
     "dashboard-data", views.DashboardDataViewSet, basename="dashboard"
 )
@@ -22,4 +23,9 @@ app_name = "participant"
 
 urlpatterns = [
     path("", include(router.urls)),
+    path(
+        "exports/<slug:resource>.<slug:fmt>",
+        views.ExportView.as_view(),
+        name="export",
+    ),
 ]
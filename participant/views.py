@@ -1,38 +1,65 @@
-import random
-from datetime import date, timezone
+from datetime import date
 
-from django.conf import settings
-from django.db.models import Count, Q
+from django.db import IntegrityError, transaction
+from django.db.models import OuterRef, Subquery
 from django.db.models.functions import Lower
-from django.http import JsonResponse
-from django.utils import timezone
-from rest_framework import mixins, pagination, status, viewsets
-from rest_framework.authentication import TokenAuthentication
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from core.constants import EVENT_DAY_TO_DATE_MAPPING
-from core.messaging import send_attendance_message, send_pickup_message
+from core.event_calendar import get_event_day
+from core.messaging import pickup_message, queue_messages
 from core.models import (
+    ADMISSION,
+    PICKUP,
+    AttendanceEvent,
     AttendanceType,
     Church,
     Grade,
     Participant,
-    ParticipantAttendance,
-    ParticipantPickup,
-    PickupCode,
     Session,
     Volunteer,
 )
+from core.pickup_codes import lookup_pickup_code
 from participant import permissions
+from participant.checkin import (
+    admit_participant,
+    issue_pickup_codes,
+    pickup_participant,
+)
+from participant.conditional import ConditionalListMixin, etag_matches
+from participant.dashboard import get_dashboard_data
+from participant.delta import DeltaSyncMixin
+from participant.exports import EXPORT_FORMATS, EXPORT_RESOURCES
+from participant.idempotency import idempotent
+from participant.imports import (
+    IMPORT_FORMATS,
+    ImportFormatError,
+    import_participants,
+)
+from participant.pagination import KeysetPagination
+from participant.projections import SparseFieldsMixin, datetime_converter
+from participant.search import (
+    participant_search_filter,
+    pickup_code_filter,
+    rank_participants,
+)
 from participant.serializers import (
     AttendanceTypeSerializer,
+    BulkCheckInSerializer,
     ChurchSerializer,
     GradeSerializer,
     ParticipantSerializer,
     SessionSerializer,
+    SyncEventsSerializer,
     VolunteerSerializer,
 )
+from participant.sync import apply_sync_events, build_snapshot, snapshot_version
+from user.authentication import CachedTokenAuthentication
 
 
 class GradeViewSet(
@@ -65,133 +92,411 @@ class ChurchViewSet(viewsets.ModelViewSet):
     queryset = Church.objects.all().order_by("-id")
 
 
-class ParticipantViewset(viewsets.ModelViewSet):
+def admit_response(get_participant, actor):
+    """
+    Admit a participant for today and build the check-in response.
+
+    Shared by the REST and async endpoints. `get_participant` is only
+    called on an event day and raises Http404 for unknown participants.
+    """
+    today_event = get_event_day()
+    if today_event is None:
+        return JsonResponse(
+            {
+                "detail": "You can only record attendance on a valid VBS date for this year"
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if not admit_participant(get_participant(), today_event, actor):
+        return JsonResponse(
+            {
+                "detail": "This participant has already been marked as present for today."
+            },
+            status=200,
+        )
+    return JsonResponse(
+        {"detail": "Attendance recorded successfully"}, status=status.HTTP_200_OK
+    )
+
+
+def pickup_response(get_participant, actor, pickup_person):
+    """Record today's pickup of a participant and build the response"""
+    today_event = get_event_day()
+    if today_event is None:
+        return JsonResponse(
+            {
+                "detail": "You can only record pickup on a valid VBS date for this year"
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if not pickup_participant(
+        get_participant(), today_event, actor, pickup_person=pickup_person
+    ):
+        return JsonResponse(
+            {
+                "detail": "This participant has already been marked as picked up for today."
+            },
+            status=202,
+        )
+    return JsonResponse(
+        {"detail": "Pickup recorded successfully"}, status=status.HTTP_200_OK
+    )
+
+
+def pickup_code_response(code, response_class):
+    """Look up the participant holding today's pickup code"""
+    today_event = get_event_day()
+    if today_event is None:
+        return JsonResponse(
+            {"detail": "Pickup codes can only be checked on a valid VBS date"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    participant_id = lookup_pickup_code(code)
+    participant = (
+        Participant.objects.select_related("grade").filter(id=participant_id).first()
+        if participant_id is not None
+        else None
+    )
+    if participant is None:
+        return JsonResponse(
+            {"detail": "No participant has this pickup code today."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return response_class(ParticipantSerializer(participant).data)
+
+
+class ParticipantViewset(
+    DeltaSyncMixin, ConditionalListMixin, SparseFieldsMixin, viewsets.ModelViewSet
+):
     serializer_class = ParticipantSerializer
-    pagination_class = pagination.api_settings.DEFAULT_PAGINATION_CLASS
+    pagination_class = KeysetPagination
+    keyset_ordering = ("first_name_lower", "id")
     permission_classes = (permissions.isAdminUser,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     lookup_field = "id"
 
     def get_queryset(self):
         """retrieve participants list for authenticated user"""
+        if self.action in ("admit", "pickup"):
+            # check-in actions only need the participant row itself
+            return Participant.objects.all()
+        # grade is rendered by ParticipantSerializer on detail views, lists
+        # are read with values() which drops the join
         queryset = (
-            Participant.objects.all()
-            .order_by(Lower("first_name"))
-            .select_related(
-                "grade", "participantattendance", "participantpickup", "pickupcode"
-            )
+            Participant.objects.annotate(first_name_lower=Lower("first_name"))
+            .order_by("first_name_lower", "id")
+            .select_related("grade")
         )
         grade = self.request.query_params.get("grade", None)
         q = self.request.query_params.get("q", None)
+        rank = self.request.query_params.get("rank", None)
         if grade:
             queryset = queryset.filter(grade__name=grade)
         if q:
-            today = date.today()
-            today_str = f"{today:%d-%m-%Y}"
-            today_event = EVENT_DAY_TO_DATE_MAPPING[today_str]
-            day_pickup_code = f"pickupcode__{today_event}"
-            queryset = queryset.filter(
-                Q(last_name__icontains=q)
-                | Q(first_name__icontains=q)
-                | Q(**{day_pickup_code: q})
-            )
+            condition = participant_search_filter(q)
+            condition |= pickup_code_filter(q, date.today())
+            queryset = queryset.filter(condition)
+            if rank in ("true", "1"):
+                queryset = rank_participants(queryset, q)
 
         return queryset
 
+    list_includes = {"status": "include_status"}
+
+    def include_status(self, queryset):
+        """
+        Add a `today` block with the admission, pickup and code of the day
+
+        Events are read with correlated subqueries on the unique
+        (participant, event_date, kind) index, so the page is still a
+        single query.
+        """
+        events = AttendanceEvent.objects.filter(
+            participant=OuterRef("pk"), event_date=date.today()
+        )
+        queryset = queryset.annotate(
+            today_admitted_at=Subquery(
+                events.filter(kind=ADMISSION).values("timestamp")[:1]
+            ),
+            today_picked_up_at=Subquery(
+                events.filter(kind=PICKUP).values("timestamp")[:1]
+            ),
+            today_pickup_code=Subquery(
+                events.filter(kind=ADMISSION).values("pickup_code")[:1]
+            ),
+        )
+        convert = datetime_converter()
+
+        def build(row):
+            admitted_at = row["today_admitted_at"]
+            picked_up_at = row["today_picked_up_at"]
+            return {
+                "today": {
+                    "admitted_at": admitted_at and convert(admitted_at),
+                    "picked_up_at": picked_up_at and convert(picked_up_at),
+                    "pickup_code": row["today_pickup_code"],
+                }
+            }
+
+        columns = ["today_admitted_at", "today_picked_up_at", "today_pickup_code"]
+        return queryset, columns, build
+
     @action(detail=True, methods=["post"])
+    @idempotent
     def admit(self, request, pk=None, id=None):
-        today = date.today()
-        today_str = f"{today:%d-%m-%Y}"
-        if f"{today_str}" not in settings.EVENT_DATES:
+        return admit_response(self.get_object, request.user)
+
+    @action(detail=True, methods=["post"])
+    @idempotent
+    def pickup(self, request, pk=None, id=None):
+        # if not request.data.get("pickup_person"):
+        #     return JsonResponse(
+        #         {"detail": "Please enter the pickup person's name"},
+        #         status=status.HTTP_400_BAD_REQUEST,
+        #     )
+        return pickup_response(
+            self.get_object, request.user, request.data.get("pickup_person")
+        )
+
+    @action(
+        detail=False, methods=["get"], url_path=r"by-pickup-code/(?P<code>\d{5})"
+    )
+    def by_pickup_code(self, request, code=None):
+        """Return the participant holding today's pickup code"""
+        return pickup_code_response(code, Response)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        url_name="import",
+        parser_classes=(MultiPartParser,),
+    )
+    def import_file(self, request):
+        """
+        Register participants from a CSV, XLSX or NDJSON upload
+
+        The file is sent as `file`, its format is taken from the `format`
+        field or the file extension. Rows are validated in one pass and
+        loaded together, or not at all with a per-row error report.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
             return JsonResponse(
-                {
-                    "detail": "You can only record attendance on a valid VBS date for this year"
-                },
+                {"detail": "Please upload a file."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        fmt = request.data.get("format") or upload.name.rpartition(".")[2].lower()
+        if fmt not in IMPORT_FORMATS:
+            return JsonResponse(
+                {"detail": f"Supported formats are {', '.join(IMPORT_FORMATS)}."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        # Get day mapping for date
-        today_event = EVENT_DAY_TO_DATE_MAPPING[today_str]
-        day_filter_is_null = f"{today_event}__isnull"
-        if ParticipantAttendance.objects.filter(
-            participant=self.get_object(), **{day_filter_is_null: False}
-        ):
+        try:
+            created, errors = import_participants(IMPORT_FORMATS[fmt](upload.file))
+        except ImportFormatError as e:
+            return JsonResponse(
+                {"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if errors:
+            return JsonResponse(
+                {"created": 0, "errors": errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return JsonResponse({"created": created}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["post"], url_path="bulk-admit")
+    @idempotent
+    def bulk_admit(self, request):
+        """Admit several participants, e.g. siblings or a church bus, at once"""
+        today_event = get_event_day()
+        if today_event is None:
             return JsonResponse(
                 {
-                    "detail": "This participant has already been marked as present for today."
+                    "detail": "You can only record attendance on a valid VBS date for this year"
                 },
-                status=200,
+                status=status.HTTP_400_BAD_REQUEST,
             )
-        ParticipantAttendance.objects.update_or_create(
-            participant=self.get_object(), defaults={**{today_event: timezone.now()}}
-        )
-        # Create participant pickup code record
-        pickup_code = random.randint(10000, 99999)
-        PickupCode.objects.update_or_create(
-            participant=self.get_object(), defaults={**{today_event: pickup_code}}
-        )
+        serializer = BulkCheckInSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data["ids"]))
+        participants = Participant.objects.in_bulk(ids)
+        results = {
+            participant_id: "not_found"
+            for participant_id in ids
+            if participant_id not in participants
+        }
 
-        send_attendance_message(
-            participant=self.get_object(), vbs_day=today_event, pickup_code=pickup_code
-        )
+        try:
+            with transaction.atomic():
+                self.bulk_record_events(
+                    participants, ADMISSION, request.user, results,
+                    "admitted", "already_admitted", event_day=today_event,
+                )
+        except IntegrityError:
+            return JsonResponse(
+                {"detail": "Some participants were checked in concurrently, please retry."},
+                status=status.HTTP_409_CONFLICT,
+            )
         return JsonResponse(
-            {"detail": "Attendance recorded successfully"}, status=status.HTTP_200_OK
+            {"results": [{"id": i, "status": results[i]} for i in ids]},
+            status=status.HTTP_200_OK,
         )
 
-    @action(detail=True, methods=["post"])
-    def pickup(self, request, pk=None, id=None):
-        today = date.today()
-        today_str = f"{today:%d-%m-%Y}"
-        if f"{today_str}" not in settings.EVENT_DATES:
+    @action(detail=False, methods=["post"], url_path="bulk-pickup")
+    @idempotent
+    def bulk_pickup(self, request):
+        """Record pickup for several participants at once"""
+        today_event = get_event_day()
+        if today_event is None:
             return JsonResponse(
                 {
                     "detail": "You can only record pickup on a valid VBS date for this year"
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        serializer = BulkCheckInSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data["ids"]))
+        participants = Participant.objects.in_bulk(ids)
+        results = {
+            participant_id: "not_found"
+            for participant_id in ids
+            if participant_id not in participants
+        }
 
-        # if not request.data.get("pickup_person"):
-        #     return JsonResponse(
-        #         {"detail": "Please enter the pickup person's name"},
-        #         status=status.HTTP_400_BAD_REQUEST,
-        #     )
-        # Get day mapping for date
-        today_event = EVENT_DAY_TO_DATE_MAPPING[today_str]
-        day_filter_is_null = f"{today_event}__isnull"
-        if ParticipantPickup.objects.filter(
-            participant=self.get_object(), **{day_filter_is_null: False}
-        ):
+        try:
+            with transaction.atomic():
+                picked_up = self.bulk_record_events(
+                    participants, PICKUP, request.user, results,
+                    "picked_up", "already_picked_up",
+                    pickup_person=serializer.validated_data.get("pickup_person"),
+                )
+                queue_messages(
+                    (
+                        participants[participant_id].primary_contact_no,
+                        pickup_message(
+                            participants[participant_id],
+                            today_event,
+                            serializer.validated_data.get("pickup_person"),
+                        ),
+                    )
+                    for participant_id in picked_up
+                )
+        except IntegrityError:
             return JsonResponse(
-                {
-                    "detail": "This participant has already been marked as picked up for today."
-                },
-                status=202,
+                {"detail": "Some participants were checked out concurrently, please retry."},
+                status=status.HTTP_409_CONFLICT,
             )
-
-        # day_pickup_person = f"{today_event}_pickup_person"
-        ParticipantPickup.objects.update_or_create(
-            participant=self.get_object(),
-            defaults={
-                **{
-                    # day_pickup_person: request.data.get("pickup_person"),
-                    today_event: timezone.now(),
-                }
-            },
-        )
-        send_pickup_message(
-            participant=self.get_object(),
-            vbs_day=today_event,
-            pickup_person=request.data.get("pickup_person"),
-        )
         return JsonResponse(
-            {"detail": "Pickup recorded successfully"}, status=status.HTTP_200_OK
+            {"results": [{"id": i, "status": results[i]} for i in ids]},
+            status=status.HTTP_200_OK,
         )
 
+    @staticmethod
+    def bulk_record_events(
+        participants,
+        kind,
+        actor,
+        results,
+        done,
+        already_done,
+        pickup_person=None,
+        event_day=None,
+    ):
+        """
+        Insert today's admission or pickup events for many participants.
+
+        Participants that already have the event today are skipped and the
+        rest are inserted in one statement, admissions with the pickup codes
+        issued for `event_day`. Fills `results` and returns the ids of the
+        participants recorded.
+        """
+        today = date.today()
+        recorded = set(
+            AttendanceEvent.objects.filter(
+                participant_id__in=participants, event_date=today, kind=kind
+            ).values_list("participant_id", flat=True)
+        )
+        new_ids = []
+        for participant_id in participants:
+            if participant_id in recorded:
+                results[participant_id] = already_done
+            else:
+                results[participant_id] = done
+                new_ids.append(participant_id)
+        new_events = [
+            AttendanceEvent(
+                participant_id=participant_id,
+                event_date=today,
+                kind=kind,
+                actor=actor if actor.is_authenticated else None,
+                pickup_person=pickup_person,
+            )
+            for participant_id in new_ids
+        ]
+        if kind == ADMISSION:
+            issue_pickup_codes(participants, event_day, new_events)
+        AttendanceEvent.objects.bulk_create(new_events)
+        return new_ids
+
+
+class SyncViewSet(viewsets.ViewSet):
+    """
+    Offline check-in for gate tablets
+
+    * Requires token authentication
+    * Only admin users are able to access this view
+
+    """
+
+    permission_classes = (permissions.isAdminUser,)
+    authentication_classes = (CachedTokenAuthentication,)
 
-class VolunteerViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=["get"])
+    def snapshot(self, request):
+        """
+        Return today's roster, or 304 when the device's version is current
+        """
+        version = snapshot_version()
+        if etag_matches(request, version):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response({"version": version, **build_snapshot()})
+        response["ETag"] = version
+        return response
+
+    @action(detail=False, methods=["post"])
+    def events(self, request):
+        """
+        Apply a batch of offline admit/pickup events in one transaction
+
+        Events carry a device assigned id, so a batch can be resent safely
+        after a lost response.
+        """
+        serializer = SyncEventsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            with transaction.atomic():
+                results = apply_sync_events(
+                    serializer.validated_data["events"], request.user
+                )
+        except IntegrityError:
+            return JsonResponse(
+                {"detail": "Some events were recorded concurrently, please retry."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response({"results": results, "version": snapshot_version()})
+
+
+class VolunteerViewSet(
+    DeltaSyncMixin, ConditionalListMixin, SparseFieldsMixin, viewsets.ModelViewSet
+):
     serializer_class = VolunteerSerializer
-    pagination_class = pagination.api_settings.DEFAULT_PAGINATION_CLASS
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-id",)
     permission_classes = (permissions.isAdminUser,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     lookup_field = "id"
 
     def get_queryset(self):
@@ -206,6 +511,30 @@ class VolunteerViewSet(viewsets.ModelViewSet):
         return queryset
 
 
+class ExportView(APIView):
+    """
+    Stream a full export of a resource as CSV or NDJSON
+
+    * Requires token authentication
+    * Only staff users are able to access this view
+
+    On Lambda the response is buffered whole by serverless-wsgi, so it is
+    bound by the response payload and API Gateway timeout limits, see the
+    README.
+    """
+
+    permission_classes = (IsAdminUser,)
+    authentication_classes = (CachedTokenAuthentication,)
+
+    def get(self, request, resource, fmt):
+        if resource not in EXPORT_RESOURCES or fmt not in EXPORT_FORMATS:
+            raise Http404
+        stream, content_type = EXPORT_FORMATS[fmt]
+        response = StreamingHttpResponse(stream(resource), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{resource}.{fmt}"'
+        return response
+
+
 class DashboardDataViewSet(viewsets.ViewSet):
     """
     View to return dashboard data
@@ -216,56 +545,16 @@ class DashboardDataViewSet(viewsets.ViewSet):
     """
 
     permission_classes = (permissions.isAdminUser,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
 
     def list(self, request, *args, **kwargs):
         """
-        Return dashboard data
+        Return dashboard data, or 304 when the client's ETag is current
         """
-        participant_queryset = Participant.objects.all()
-        volunteer_queryset = Volunteer.objects.all()
-
-        year, week, _ = timezone.now().isocalendar()
-
-        participants_this_week_queryset = participant_queryset.filter(
-            created__iso_year=year, created__week=week
-        )
-        volunteers_this_week_queryset = volunteer_queryset.filter(
-            created__iso_year=year, created__week=week
-        )
-
-        participant_church_queryset = participant_queryset.distinct("church")
-        volunteer_church_queryset = volunteer_queryset.distinct("church")
-
-        participant_churches_this_week_queryset = (
-            participants_this_week_queryset.distinct("church")
-        )
-        volunteer_churches_this_week_queryset = (
-            volunteers_this_week_queryset.distinct("church")
-        )
-
-        participant_class_distribution = Participant.objects.values(
-            "grade"
-        ).annotate(count=Count("grade"))
-
-        volunteer_class_distribution = Volunteer.objects.values(
-            "preferred_class"
-        ).annotate(count=Count("preferred_class"))
-
-        dashboard_data = {
-            "overview": {
-                "participants": participant_queryset.count(),
-                "volunteers": volunteer_queryset.count(),
-                "participant_churches": participant_church_queryset.count(),
-                "volunteer_churches": volunteer_church_queryset.count(),
-                "participants_this_week": participants_this_week_queryset.count(),
-                "volunteers_this_week": volunteers_this_week_queryset.count(),
-                "participant_churches_this_week": participant_churches_this_week_queryset.count(),
-                "volunteer_churches_this_week": volunteer_churches_this_week_queryset.count(),
-            },
-            "distributions": {
-                "participant_class_distribution": participant_class_distribution,
-                "volunteer_class_distribution": volunteer_class_distribution,
-            },
-        }
-        return Response(dashboard_data)
+        dashboard_data, etag = get_dashboard_data()
+        if etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(dashboard_data)
+        response["ETag"] = etag
+        return response
@@ -0,0 +1,54 @@
+"""
+API-only settings for the serverless deployment.
+
+Lambda containers start on demand, often at peak check-in time, so this
+profile loads only what the JSON API needs: no admin and its filter and
+export apps, no static files, no messages framework and no browsable API.
+The admin keeps running with the full settings.
+"""
+from settings import *  # noqa
+from settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK, TEMPLATES
+
+ADMIN_APPS = (
+    "more_admin_filters",
+    "rangefilter",
+    "django.contrib.admin",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "admin_export_action",
+)
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in ADMIN_APPS]
+
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if middleware
+    not in (
+        "whitenoise.middleware.WhiteNoiseMiddleware",
+        "django.contrib.messages.middleware.MessageMiddleware",
+    )
+]
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "OPTIONS": {
+            "context_processors": [
+                processor
+                for processor in TEMPLATES[0]["OPTIONS"]["context_processors"]
+                if processor != "django.contrib.messages.context_processors.messages"
+            ],
+        },
+    }
+]
+
+ROOT_URLCONF = "vbs_registration.api_urls"
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_RENDERER_CLASSES": [
+        renderer
+        for renderer in REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"]
+        if renderer != "rest_framework.renderers.BrowsableAPIRenderer"
+    ],
+}
@@ -0,0 +1,12 @@
+"""
+Settings for the ASGI check-in worker.
+
+The worker only serves the async check-in endpoints of
+participant.async_views. The REST API and the exports stay on WSGI:
+Django 3.2 runs sync views one at a time under ASGI, which benchmarked
+slower than WSGI, and iterates streaming responses in the event loop,
+where the export generators would block it on their database cursors.
+"""
+from settings.api import *  # noqa
+
+ROOT_URLCONF = "vbs_registration.asgi_urls"
@@ -12,7 +12,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 
 import os
 
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -36,6 +36,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework.authtoken",
     "core",
@@ -46,9 +47,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.HealthCheckMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "core.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -90,10 +93,45 @@ DATABASES = {
         "USER": config("DB_USER"),
         "PASSWORD": config("DB_PASSWORD"),
         "PORT": config("DB_PORT"),
+        # keep connections open between requests and warm Lambda
+        # invocations, 0 closes them after every request
+        "CONN_MAX_AGE": config("DB_CONN_MAX_AGE", default=60, cast=int),
+        # ping reused connections before a request, see core.db
+        "CONN_HEALTH_CHECKS": config("DB_CONN_HEALTH_CHECKS", default=True, cast=bool),
+        # required behind pgbouncer in transaction pooling mode
+        "DISABLE_SERVER_SIDE_CURSORS": config(
+            "DB_DISABLE_SERVER_SIDE_CURSORS", default=False, cast=bool
+        ),
+        "OPTIONS": {
+            # fail fast instead of hanging on an unreachable host, so
+            # wait_for_db and /readyz get a prompt answer
+            "connect_timeout": config("DB_CONNECT_TIMEOUT", default=5, cast=int),
+        },
     }
 }
 
 
+# Cache
+# Per-process by default, set CACHE_BACKEND/CACHE_LOCATION to share the
+# cache between workers.
+
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": config("CACHE_LOCATION", default=""),
+    }
+}
+
+# responses smaller than this many bytes are sent uncompressed
+COMPRESSION_MIN_SIZE = config("COMPRESSION_MIN_SIZE", default=1024, cast=int)
+# /readyz reports the database as degraded above this many milliseconds,
+# 0 only checks that it answers
+READYZ_MAX_DB_LATENCY = config("READYZ_MAX_DB_LATENCY", default=1000, cast=int)
+DASHBOARD_CACHE_TIMEOUT = config("DASHBOARD_CACHE_TIMEOUT", default=30, cast=int)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -134,6 +172,11 @@ LOGGING = {
 REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 1000,
+    "DEFAULT_RENDERER_CLASSES": config(
+        "API_RENDERER_CLASSES",
+        default="core.renderers.ORJSONRenderer,rest_framework.renderers.BrowsableAPIRenderer",
+        cast=Csv(),
+    ),
 }
 
 ADMIN_EXPORT_ACTION = {"ENABLE_SITEWIDE": False}
@@ -152,9 +195,30 @@ USE_L10N = True
 
 USE_TZ = True
 
-EVENT_DATES = config("EVENT_DATES", cast=lambda v: [s.strip() for s in v.split(",")])
+IDEMPOTENCY_KEY_TTL = config("IDEMPOTENCY_KEY_TTL", default=60 * 60 * 24, cast=int)
+EVENT_CALENDAR_TTL = config("EVENT_CALENDAR_TTL", default=300, cast=int)
+# API tokens expire after TOKEN_TTL seconds, 0 keeps them until logout.
+# Token lookups are cached for TOKEN_CACHE_TTL seconds, in a per-process
+# LRU of TOKEN_CACHE_SIZE entries and in the default cache.
+TOKEN_TTL = config("TOKEN_TTL", default=0, cast=int)
+TOKEN_CACHE_TTL = config("TOKEN_CACHE_TTL", default=60, cast=int)
+TOKEN_CACHE_SIZE = config("TOKEN_CACHE_SIZE", default=1024, cast=int)
+# ?modified_since= responses overlap the previous poll by this many seconds,
+# covering rows saved by transactions that had not committed yet
+DELTA_SYNC_OVERLAP = config("DELTA_SYNC_OVERLAP", default=5, cast=int)
 SMS_ENDPOINT = config("SMS_ENDPOINT")
 SMS_API_KEY = config("SMS_API_KEY")
+SMS_TIMEOUT = config("SMS_TIMEOUT", default=10, cast=int)
+SMS_MAX_ATTEMPTS = config("SMS_MAX_ATTEMPTS", default=5, cast=int)
+SMS_RETRY_BACKOFF = config("SMS_RETRY_BACKOFF", default=30, cast=int)
+SMS_BATCH_SIZE = config("SMS_BATCH_SIZE", default=100, cast=int)
+SMS_RATE_LIMIT = config("SMS_RATE_LIMIT", default=10, cast=float)
+SMS_POOL_SIZE = config("SMS_POOL_SIZE", default=4, cast=int)
+# seconds a worker holds the messages it claimed before others may retry them
+SMS_CLAIM_TIMEOUT = config("SMS_CLAIM_TIMEOUT", default=300, cast=int)
+# seconds one delivery run may spend starting gateway calls, the outbox
+# function's timeout has to cover it plus SMS_TIMEOUT for the last call
+SMS_SEND_BUDGET = config("SMS_SEND_BUDGET", default=40, cast=int)
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/2.2/howto/static-files/
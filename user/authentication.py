@@ -0,0 +1,138 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+class LocalTokenCache:
+    """Thread safe per-process LRU of token key -> cache entry with expiry"""
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + timeout)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_tokens = LocalTokenCache(settings.TOKEN_CACHE_SIZE)
+
+
+def token_cache_key(key):
+    # keep raw tokens out of cache keys
+    return f"auth_token:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def forget_token(key):
+    """Drop a token from both caches, e.g. after logout or a user change"""
+    local_tokens.delete(key)
+    cache.delete(token_cache_key(key))
+
+
+def cached_user_fields():
+    """Return the user columns kept in the token caches, all but the password"""
+    return [
+        field.attname
+        for field in get_user_model()._meta.concrete_fields
+        if field.attname != "password"
+    ]
+
+
+def token_entry(token):
+    """Return what the token caches keep of a token: plain values, no models"""
+    return (token.created, [getattr(token.user, name) for name in cached_user_fields()])
+
+
+def token_from_entry(key, entry):
+    """
+    Build a new Token and User from a cache entry.
+
+    Every request gets its own instances. The password is left deferred,
+    so it is only read if something asks for it and save() leaves it alone.
+    """
+    created, values = entry
+    user_model = get_user_model()
+    user = user_model.from_db(
+        router.db_for_read(user_model), cached_user_fields(), values
+    )
+    return Token(key=key, user=user, created=created)
+
+
+def token_expired(token):
+    return bool(settings.TOKEN_TTL) and (
+        token.created < timezone.now() - timedelta(seconds=settings.TOKEN_TTL)
+    )
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that remembers token -> user lookups.
+
+    Tokens are looked up in a per-process LRU, then in the shared cache and
+    only then in the database, both caches hold a token for TOKEN_CACHE_TTL
+    seconds. They keep the token's creation time and the user's columns
+    without the password hash, each request gets fresh instances built
+    from them. Deleting a token or saving its user evicts it from the shared
+    cache and this process's LRU; other processes notice within the TTL.
+    Tokens older than TOKEN_TTL seconds are rejected and deleted when
+    TOKEN_TTL is set. The user's last_used is refreshed on every database
+    lookup, so it tracks API use to within TOKEN_CACHE_TTL seconds;
+    last_login is left to logins.
+    """
+
+    def authenticate_credentials(self, key):
+        entry = local_tokens.get(key)
+        if entry is None:
+            entry = cache.get(token_cache_key(key))
+            if entry is None:
+                user, token = super().authenticate_credentials(key)
+                # update() skips post_save, which would evict the token again
+                get_user_model().objects.filter(pk=user.pk).update(
+                    last_used=timezone.now()
+                )
+                entry = token_entry(token)
+                cache.set(token_cache_key(key), entry, settings.TOKEN_CACHE_TTL)
+            local_tokens.set(key, entry, settings.TOKEN_CACHE_TTL)
+
+        token = token_from_entry(key, entry)
+        if token_expired(token):
+            Token.objects.filter(key=key).delete()
+            forget_token(key)
+            raise exceptions.AuthenticationFailed(_("Token has expired."))
+        return (token.user, token)
@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from user.authentication import forget_token
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    """stop accepting a deleted token straight away"""
+    forget_token(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+def forget_user_token(sender, instance, created, **kwargs):
+    """drop the cached copy of a changed user, e.g. deactivated or demoted"""
+    if created:
+        return
+    for key in Token.objects.filter(user=instance).values_list("key", flat=True):
+        forget_token(key)
@@ -1,14 +1,26 @@
-from django.test import TestCase
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.urls import reverse
+from django.utils import timezone
 
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
+from user.authentication import (
+    CachedTokenAuthentication,
+    local_tokens,
+    token_cache_key,
+)
+
 
 CREATE_USER_URL = reverse('user:create')
 TOKEN_URL = reverse('user:token')
 OWN_URL = reverse('user:self')
+LOGOUT_URL = reverse('user:logout')
 
 
 def create_user(**params):
@@ -156,3 +168,94 @@ class PrivateUserTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(self.user.first_name, payload['first_name'])
         self.assertTrue(self.user.check_password(payload['password']))
+
+
+class TokenAuthenticationTests(TestCase):
+    """test the cached token authentication"""
+
+    def setUp(self):
+        cache.clear()
+        local_tokens.clear()
+        self.user = create_user(**sample_user())
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_token_lookup_is_cached(self):
+        """test repeated requests do not look the token up again"""
+        self.client.get(OWN_URL)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_used)
+        self.assertIsNone(self.user.last_login)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(OWN_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        # the shared cache answers when the local copy is gone
+        local_tokens.clear()
+        with self.assertNumQueries(0):
+            res = self.client.get(OWN_URL)
+        self.assertEqual(res.data['email'], self.user.email)
+
+    def test_cached_token_holds_no_password_hash(self):
+        """test the caches keep plain user values and every lookup gets its own user"""
+        auth = CachedTokenAuthentication()
+        user, _ = auth.authenticate_credentials(self.token.key)
+        self.assertNotIn(self.user.password, repr(cache.get(token_cache_key(self.token.key))))
+
+        cached_user, token = auth.authenticate_credentials(self.token.key)
+        self.assertIsNot(cached_user, user)
+        self.assertEqual(cached_user.pk, self.user.pk)
+        self.assertEqual(token.user_id, self.user.pk)
+
+        # the deferred password survives saving the cached user
+        cached_user.first_name = 'Kofi'
+        cached_user.save()
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password(sample_user()['password']))
+
+    def test_logout_revokes_token(self):
+        """test a token stops working right after logout"""
+        self.client.get(OWN_URL)
+
+        res = self.client.post(LOGOUT_URL)
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        res = self.client.get(OWN_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_revokes_token(self):
+        """test changing the password signs out cached tokens"""
+        self.client.get(OWN_URL)
+
+        self.client.patch(OWN_URL, {'password': 'new password'})
+
+        res = self.client.get(OWN_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        """test deactivating a user evicts the cached token"""
+        self.client.get(OWN_URL)
+
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(OWN_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TOKEN_TTL=60)
+    def test_expired_token_is_rejected(self):
+        """test tokens older than TOKEN_TTL are refused and replaced on login"""
+        self.client.get(OWN_URL)
+        Token.objects.filter(pk=self.token.pk).update(
+            created=timezone.now() - timedelta(seconds=61))
+        cache.clear()
+        local_tokens.clear()
+
+        res = self.client.get(OWN_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(Token.objects.filter(key=self.token.key).exists())
+
+        res = APIClient().post(TOKEN_URL, sample_user())
+        self.assertNotEqual(res.data['token'], self.token.key)
@@ -7,5 +7,6 @@ app_name = 'user'
 urlpatterns = [
     path('create/', views.CreateUserView.as_view(), name='create'),
     path('token/', views.CreateTokenView.as_view(), name='token'),
-    path('self/', views.ManageUserView.as_view(), name='self')
+    path('self/', views.ManageUserView.as_view(), name='self'),
+    path('logout/', views.LogoutView.as_view(), name='logout'),
 ]
@@ -0,0 +1,7 @@
+"""vbs_registration URL configuration for the API-only settings"""
+from django.urls import include, path
+
+urlpatterns = [
+    path("api/user/", include("user.urls")),
+    path("api/", include("participant.urls")),
+]
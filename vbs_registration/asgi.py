@@ -0,0 +1,18 @@
+"""
+ASGI config for vbs_registration project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+It only serves the async check-in endpoints, see settings.asgi. The REST
+API, the exports and the admin are served by vbs_registration.wsgi.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings.asgi')
+
+application = get_asgi_application()
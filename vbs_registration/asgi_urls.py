@@ -0,0 +1,6 @@
+"""vbs_registration URL configuration for the ASGI check-in worker"""
+from django.urls import include, path
+
+urlpatterns = [
+    path("api/", include("participant.async_urls")),
+]